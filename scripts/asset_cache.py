@@ -0,0 +1,128 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+from collections import OrderedDict
+
+from PIL import Image
+from asset_store import load_stored
+from constants import ASSET_CACHE_MAX_BYTES
+from profiling import count
+from scaling import resample
+
+
+class AssetCache:
+    """In-memory LRU cache of decoded images, keyed by path and modification time"""
+
+    def __init__(self, max_bytes=ASSET_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_decoded = 0
+        self._entries = OrderedDict()   # (path, mode, scale, mask path) -> (mtimes, image)
+
+    def load(self, path, mode=None, scale=1, mask_path=None):
+        """Returns a private copy of the decoded image, converted to mode, with mask_path as its alpha
+        and resampled to scale if given"""
+        path = os.path.abspath(path)
+        mask_path = os.path.abspath(mask_path) if mask_path else None
+        key = (path, mode, scale, mask_path)
+        mtime = (os.path.getmtime(path), os.path.getmtime(mask_path) if mask_path else None)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == mtime:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            count("asset_cache.hits")
+            return entry[1].copy()
+
+        self.misses += 1
+        count("asset_cache.misses")
+
+        if scale != 1:
+            # Resample the (cached) 1x image once, then keep this scale too
+            image = resample(self.load(path, mode, mask_path=mask_path), scale)
+            self._store(key, mtime, image)
+            return image.copy()
+
+        image = load_stored(path, mode, mask_path)
+        if image is not None:
+            count("asset_store.hits")
+        else:
+            image = self._decode(path, mode)
+            self.bytes_decoded += self._image_bytes(image)
+            count("asset_cache.bytes_decoded", self._image_bytes(image))
+            if mask_path is not None:
+                image.putalpha(self.load(mask_path, "L"))
+        self._store(key, mtime, image)
+
+        # Hand out a copy so callers can putalpha/crop/draw without touching the cached layer
+        return image.copy()
+
+    def resize(self, max_bytes):
+        """Changes the size limit, evicting entries if the cache is now over budget"""
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    @staticmethod
+    def _decode(path, mode):
+        with Image.open(path) as image:
+            image.load()
+            if mode is not None and image.mode != mode:
+                return image.convert(mode)
+            return image.copy()
+
+    @staticmethod
+    def _image_bytes(image):
+        return image.width * image.height * len(image.getbands())
+
+    def _store(self, key, mtime, image):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= self._image_bytes(old[1])
+
+        size = self._image_bytes(image)
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = (mtime, image)
+        self.current_bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self._entries and self.current_bytes > self.max_bytes:
+            _, (_, image) = self._entries.popitem(last=False)
+            self.current_bytes -= self._image_bytes(image)
+
+
+# Shared by every Card in the process
+asset_cache = AssetCache()
+
+
+def load_image(path, mode=None, scale=1):
+    """Loads an image through the process-wide asset cache"""
+    return asset_cache.load(path, mode, scale)
+
+
+def load_masked_art(art_path, mask_path, scale=1):
+    """Loads card art with the mask applied, from the asset store when it was pre-masked there"""
+    return asset_cache.load(art_path, None, scale, mask_path)
@@ -0,0 +1,291 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Pre-converted asset store: every DDS under assets/ decoded once into raw pixels in a single
+memory-mapped file, so renders read layers straight out of the page cache instead of decoding DXT.
+
+    assets/.store/store.bin     raw pixel data, one entry after another, then the index
+                                (entry -> offset, size, dimensions, mode and source mtimes) as JSON,
+                                then the index length and STORE_MAGIC
+
+Pixels and index live in one file so a recompile swaps both with a single os.replace: a reader opening
+the store mid-compile gets either the old file or the new one, never new pixels with old offsets.
+"""
+import argparse
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+
+from PIL import Image
+from constants import *
+
+STORE_VERSION = 1
+STORE_MAGIC = b"TCSTORE1"
+FOOTER = struct.Struct("<Q8s")     # Index length in bytes, STORE_MAGIC
+
+
+def _relpath(path, assets_dir):
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(assets_dir)).replace(os.sep, "/")
+
+
+def _entry_key(rel, mode=None, mask_rel=None):
+    key = rel
+    if mask_rel is not None:
+        key += f"+{mask_rel}"
+    if mode is not None:
+        key += f"|{mode}"
+    return key
+
+
+def _mtime(path):
+    return os.stat(path).st_mtime_ns
+
+
+def _read_index(buffer):
+    """Returns the index stored at the end of a store file's contents (bytes or mmap)"""
+    if len(buffer) < FOOTER.size:
+        raise ValueError("asset store is truncated")
+    index_size, magic = FOOTER.unpack_from(buffer, len(buffer) - FOOTER.size)
+    index_end = len(buffer) - FOOTER.size
+    if magic != STORE_MAGIC or index_size > index_end:
+        raise ValueError("not an asset store, or written by another version")
+    index = json.loads(bytes(buffer[index_end - index_size:index_end]))
+    if index.get("version") != STORE_VERSION:
+        raise ValueError("asset store written by another version")
+    return index
+
+
+class AssetStore:
+    """Read-only view of a compiled store
+
+    Mapped, every image it returns is backed by the mmap (zero-copy, but the pages it touches count as
+    resident memory of this process). Unmapped, each entry is read with pread into a private image, so
+    only the callers' caches decide how much stays in memory.
+    """
+
+    def __init__(self, store_dir=ASSET_STORE_DIR, assets_dir=ASSETS_DIR, mapped=True):
+        self.assets_dir = assets_dir
+        store_path = os.path.join(store_dir, "store.bin")
+        self._mmap = self._view = self._file = None
+        if mapped:
+            with open(store_path, "rb") as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.entries = _read_index(self._mmap)["entries"]
+            self._view = memoryview(self._mmap)
+        else:
+            self.entries = _read_index_from(store_path)["entries"]
+            self._file = open(store_path, "rb")
+
+    def get(self, path, mode=None, mask_path=None):
+        """Returns the stored image for path (with mask_path already applied), or None if missing or stale"""
+        rel = _relpath(path, self.assets_dir)
+        mask_rel = _relpath(mask_path, self.assets_dir) if mask_path else None
+        entry = self.entries.get(_entry_key(rel, mode, mask_rel))
+        if entry is None:
+            return None
+
+        # Sources edited since the compile step are decoded the slow way until the next compile
+        for source_rel, mtime in entry["sources"].items():
+            source_path = os.path.join(self.assets_dir, source_rel)
+            if not os.path.exists(source_path) or _mtime(source_path) != mtime:
+                return None
+
+        size = (entry["width"], entry["height"])
+        if self._view is None:
+            return Image.frombytes(entry["mode"], size, os.pread(self._file.fileno(), entry["size"], entry["offset"]))
+        data = self._view[entry["offset"]:entry["offset"] + entry["size"]]
+        return Image.frombuffer(entry["mode"], size, data, "raw", entry["mode"], 0, 1)
+
+
+_store = None
+_store_checked = False
+_store_mapped = True
+
+
+def get_asset_store():
+    """Returns the compiled store if one exists, opening it on first use"""
+    global _store, _store_checked
+    if not _store_checked:
+        _store_checked = True
+        if os.path.exists(os.path.join(ASSET_STORE_DIR, "store.bin")):
+            try:
+                _store = AssetStore(mapped=_store_mapped)
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Ignoring unreadable asset store in {ASSET_STORE_DIR} ({e})")
+    return _store
+
+
+def load_stored(path, mode=None, mask_path=None):
+    """Zero-copy image from the compiled store, or None when it has no fresh entry"""
+    store = get_asset_store()
+    return store.get(path, mode, mask_path) if store is not None else None
+
+
+def set_store_mapping(mapped):
+    """Chooses between mmap (default, zero-copy) and pread reads of the store, e.g. pread under --memory-budget"""
+    global _store_mapped
+    _store_mapped = mapped
+    close_asset_store()
+
+
+def close_asset_store():
+    """Forgets the open store (e.g. before recompiling it); images already handed out keep it mapped"""
+    global _store, _store_checked
+    _store = None
+    _store_checked = False
+
+
+def _planned_entries(assets_dir, decks_dir):
+    """Returns {entry key: (source rel, mode, mask rel)} for everything the store should hold"""
+    planned = {}
+    for path in glob.glob(os.path.join(assets_dir, "**", "*.dds"), recursive=True):
+        rel = _relpath(path, assets_dir)
+        planned[_entry_key(rel)] = (rel, None, None)
+
+    for mask_filename in CARD_FRAME_MASKS.values():
+        if os.path.exists(os.path.join(assets_dir, mask_filename)):
+            planned[_entry_key(mask_filename, "L")] = (mask_filename, "L", None)
+
+    # Card art with the agent/action mask already applied, as Card._load_card_art would build it
+    for deck_path in glob.glob(os.path.join(decks_dir, "*.json")):
+        with open(deck_path, "r") as file:
+            try:
+                records = json.load(file)
+            except json.JSONDecodeError:
+                continue
+        for record in records:
+            if not isinstance(record, dict) or "art" not in record or "type" not in record:
+                continue
+            art_rel = f"cards/{record['art']}"
+            mask_rel = CARD_FRAME_MASKS["agent" if "Agent" in record["type"] else "action"]
+            if os.path.exists(os.path.join(assets_dir, art_rel)) and os.path.exists(os.path.join(assets_dir, mask_rel)):
+                planned[_entry_key(art_rel, None, mask_rel)] = (art_rel, None, mask_rel)
+
+    return planned
+
+
+def _sources(assets_dir, rel, mask_rel):
+    sources = {rel: _mtime(os.path.join(assets_dir, rel))}
+    if mask_rel is not None:
+        sources[mask_rel] = _mtime(os.path.join(assets_dir, mask_rel))
+    return sources
+
+
+def _read_index_from(store_path):
+    """Reads only the index at the end of a store file, without mapping the pixels"""
+    with open(store_path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        file_size = file.tell()
+        if file_size < FOOTER.size:
+            raise ValueError("asset store is truncated")
+        file.seek(file_size - FOOTER.size)
+        index_size, _ = FOOTER.unpack(file.read(FOOTER.size))
+        file.seek(max(file_size - FOOTER.size - index_size, 0))
+        return _read_index(file.read())
+
+
+def _is_up_to_date(store_path, assets_dir, planned):
+    try:
+        index = _read_index_from(store_path)
+    except (OSError, ValueError):
+        return False
+
+    entries = index.get("entries", {})
+    if set(entries) != set(planned):
+        return False
+
+    for key, (rel, _, mask_rel) in planned.items():
+        if entries[key]["sources"] != _sources(assets_dir, rel, mask_rel):
+            return False
+    return True
+
+
+def _decode(assets_dir, rel, mode, mask_rel):
+    with Image.open(os.path.join(assets_dir, rel)) as image:
+        image.load()
+        if mode is not None and image.mode != mode:
+            image = image.convert(mode)
+        elif image.mode not in ("L", "RGBA"):
+            image = image.convert("RGBA")   # Keep every entry mappable without a copy
+        else:
+            image = image.copy()
+
+    if mask_rel is not None:
+        with Image.open(os.path.join(assets_dir, mask_rel)) as mask:
+            image.putalpha(mask.convert("L"))
+    return image
+
+
+def compile_asset_store(assets_dir=ASSETS_DIR, store_dir=ASSET_STORE_DIR, decks_dir=DECKS_DIR, force=False):
+    """Decodes every DDS (and masked card art) into the store, skipping the work when nothing changed
+
+    Returns the number of entries written, or 0 when the existing store was already up to date.
+    """
+    store_path = os.path.join(store_dir, "store.bin")
+    planned = _planned_entries(assets_dir, decks_dir)
+
+    if not force and _is_up_to_date(store_path, assets_dir, planned):
+        return 0
+
+    os.makedirs(store_dir, exist_ok=True)
+    close_asset_store()
+
+    entries = {}
+    offset = 0
+    tmp_path = f"{store_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as store_file:
+        for key, (rel, mode, mask_rel) in sorted(planned.items()):
+            try:
+                image = _decode(assets_dir, rel, mode, mask_rel)
+            except OSError as e:
+                logging.warning(f"Skipping {rel} in the asset store ({e})")
+                continue
+
+            data = image.tobytes()
+            store_file.write(data)
+            entries[key] = {
+                "offset": offset,
+                "size": len(data),
+                "width": image.width,
+                "height": image.height,
+                "mode": image.mode,
+                "sources": _sources(assets_dir, rel, mask_rel),
+            }
+            offset += len(data)
+
+        index = json.dumps({"version": STORE_VERSION, "entries": entries}, sort_keys=True).encode("utf-8")
+        store_file.write(index)
+        store_file.write(FOOTER.pack(len(index), STORE_MAGIC))
+
+    # One rename swaps pixels and index together; open mmaps of the old file stay valid
+    os.replace(tmp_path, store_path)
+    return len(entries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-convert every DDS asset into a memory-mappable store")
+    parser.add_argument("--force", action="store_true", help="rebuild even if no source file changed")
+    args = parser.parse_args()
+
+    written = compile_asset_store(force=args.force)
+    if written:
+        print(f"✅ Compiled {written} assets into {ASSET_STORE_DIR}")
+    else:
+        print(f"✅ Asset store in {ASSET_STORE_DIR} is up to date")
@@ -0,0 +1,106 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+
+from PIL import Image
+from asset_store import load_stored
+from constants import *
+from profiling import count
+from scaling import resample
+
+
+class DeckAtlas:
+    """A patron atlas decoded once, keeping only the regions cards actually use"""
+
+    def __init__(self, atlas_filename):
+        self.filename = atlas_filename
+        self.path = os.path.join(ASSETS_DIR, "patrons", atlas_filename)
+        self._frame = None
+        self._suit_icon = None
+        self._scaled = {}       # (region, scale) -> image
+
+    @property
+    def frame(self):
+        """The card frame region (shared between cards, do not modify)"""
+        if self._frame is None:
+            self._load()
+        return self._frame
+
+    @property
+    def suit_icon(self):
+        """The suit icon region (shared between cards, do not modify)"""
+        if self._suit_icon is None:
+            self._load()
+        return self._suit_icon
+
+    def invalidate(self):
+        """Forgets the decoded regions, so the next card reads the atlas file again"""
+        self._frame = None
+        self._suit_icon = None
+        self._scaled = {}
+
+    def region(self, name, scale=1):
+        """The "frame" or "suit_icon" region resampled to scale, once per scale (shared, do not modify)"""
+        image = getattr(self, name)
+        if scale == 1:
+            return image
+
+        key = (name, scale)
+        if key not in self._scaled:
+            self._scaled[key] = resample(image, scale)
+        return self._scaled[key]
+
+    def _load(self):
+        stored = load_stored(self.path)
+        if stored is not None:
+            self._frame = stored.crop(ATLAS_FRAME_BOX)
+            self._suit_icon = stored.crop(ATLAS_SUIT_ICON_BOX)
+            return
+
+        # Decode the atlas once, keep the crops and let the full sheet go
+        with Image.open(self.path) as atlas:
+            atlas.load()
+            count("atlas.bytes_decoded", atlas.width * atlas.height * len(atlas.getbands()))
+            self._frame = atlas.crop(ATLAS_FRAME_BOX)
+            self._suit_icon = atlas.crop(ATLAS_SUIT_ICON_BOX)
+
+
+# Atlas filename -> DeckAtlas, one per patron sheet for the whole run
+_atlases = {}
+
+
+def get_generic_atlas():
+    """Returns the generic atlas, shared for the whole run (Curse cards and unknown decks)"""
+    return _get_atlas(DECK_ATLAS[DEFAULT_ATLAS_DECK])
+
+
+def load_deck_atlas(deck_name):
+    """Returns the atlas for a deck, shared by every card of every deck using it; decoding is deferred
+    until a card needs it"""
+    return _get_atlas(get_deck_atlas(deck_name))
+
+
+def loaded_atlases():
+    """Every atlas handed out so far, e.g. to invalidate the ones whose file changed"""
+    return list(_atlases.values())
+
+
+def _get_atlas(atlas_filename):
+    if atlas_filename not in _atlases:
+        _atlases[atlas_filename] = DeckAtlas(atlas_filename)
+    return _atlases[atlas_filename]
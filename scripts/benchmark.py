@@ -0,0 +1,182 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Renders every deck in decks/ against a synthetic asset pack and reports throughput, latency,
+peak memory and a per-stage breakdown. Results are saved as JSON so runs can be compared:
+
+    python scripts/benchmark.py --output before.json
+    python scripts/benchmark.py --baseline before.json --threshold 0.10
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from profiling import peak_rss_mb
+
+RESULTS_VERSION = 1
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_benchmark(rounds, compositor):
+    # Imported here so TRIBUTECARDS_ASSETS_DIR is already pointing at the asset pack
+    import PIL
+    from compositor import set_compositor
+    from constants import DECKS_DIR
+    from load_deck import load_deck
+    from profiling import enable, span
+
+    set_compositor(compositor)
+    recorder = enable()
+
+    deck_files = sorted(f for f in os.listdir(DECKS_DIR) if f.endswith(".json"))
+    latencies = []
+    round_seconds = []
+
+    for _ in range(rounds):
+        round_start = time.perf_counter()
+
+        for deck_file in deck_files:
+            deck_name = os.path.splitext(deck_file)[0]
+            for card in load_deck(os.path.join(DECKS_DIR, deck_file), deck_name):
+                start = time.perf_counter()
+                image = card.render()
+                with span("encode"):
+                    image.save(BytesIO(), format="PNG")
+                latencies.append(time.perf_counter() - start)
+
+        round_seconds.append(time.perf_counter() - round_start)
+
+    total_seconds = sum(round_seconds)
+    return {
+        "version": RESULTS_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "compositor": compositor,
+        },
+        "rounds": rounds,
+        "cards": len(latencies),
+        "cards_per_sec": len(latencies) / total_seconds,
+        "round_seconds": round_seconds,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "mean": statistics.mean(latencies) * 1000,
+            "max": max(latencies) * 1000,
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "counters": dict(recorder.counters),
+        "stages_ms": {
+            stage: {
+                "total": seconds * 1000,
+                "per_card": seconds * 1000 / len(latencies),
+                "calls": recorder.calls[stage],
+            }
+            for stage, seconds in sorted(recorder.seconds.items())
+        },
+    }
+
+
+def compare(results, baseline, threshold):
+    """Returns a list of regressions beyond threshold (a fraction) compared to baseline"""
+    regressions = []
+
+    allowed = baseline["cards_per_sec"] * (1 - threshold)
+    if results["cards_per_sec"] < allowed:
+        regressions.append(f"throughput {results['cards_per_sec']:.1f} cards/s < {allowed:.1f} cards/s")
+
+    for key in ("p50", "p95"):
+        allowed = baseline["latency_ms"][key] * (1 + threshold)
+        if results["latency_ms"][key] > allowed:
+            regressions.append(f"{key} latency {results['latency_ms'][key]:.2f} ms > {allowed:.2f} ms")
+
+    return regressions
+
+
+def print_report(results):
+    print(f"🎴 {results['cards']} cards in {results['rounds']} round(s): {results['cards_per_sec']:.1f} cards/s")
+    latency = results["latency_ms"]
+    print(f"⏱️ per card: p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms, max {latency['max']:.2f} ms")
+    if results["peak_rss_mb"] is not None:
+        print(f"🧠 peak RSS: {results['peak_rss_mb']:.1f} MiB")
+    for stage, times in results["stages_ms"].items():
+        print(f"   {stage:<14} {times['per_card']:8.3f} ms/card")
+
+
+def main(argv=None):
+    # constants reads TRIBUTECARDS_ASSETS_DIR on import, so --assets is picked out before the rest of the options
+    assets_parser = argparse.ArgumentParser(add_help=False)
+    assets_parser.add_argument("--assets")
+    assets = assets_parser.parse_known_args(argv)[0].assets
+    assets_dir = assets or tempfile.mkdtemp(prefix="tributecards-assets-")
+    os.environ["TRIBUTECARDS_ASSETS_DIR"] = assets_dir
+    from constants import COMPOSITORS, DEFAULT_COMPOSITOR
+
+    parser = argparse.ArgumentParser(description="Benchmark card rendering against a synthetic asset pack")
+    parser.add_argument("--assets", help="use (or create) the asset pack in this folder instead of a temporary one")
+    parser.add_argument("--rounds", type=int, default=3, help="times to render every deck (default: 3)")
+    parser.add_argument("--compositor", choices=COMPOSITORS, default=DEFAULT_COMPOSITOR,
+                        help=f"compositing engine to benchmark (default: {DEFAULT_COMPOSITOR})")
+    parser.add_argument("--output", default="bench_results.json", help="where to save the results JSON")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown versus the baseline, as a fraction (default: 0.10)")
+
+    try:
+        args = parser.parse_args(argv)
+
+        from synthetic_assets import generate_asset_pack
+        generate_asset_pack(assets_dir)
+        results = run_benchmark(args.rounds, args.compositor)
+    finally:
+        if not assets:
+            shutil.rmtree(assets_dir, ignore_errors=True)
+    print_report(results)
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"💾 Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            for regression in regressions:
+                print(f"❌ Regression: {regression}")
+            return 1
+        print(f"✅ No regression beyond {args.threshold:.0%} of {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,623 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import logging
+import logging.handlers
+import multiprocessing
+import multiprocessing.util
+import os
+import traceback
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+
+from asset_cache import asset_cache
+from asset_store import compile_asset_store, set_store_mapping
+from atlas import loaded_atlases
+from card import Card
+from compositor import set_compositor
+from content_store import ContentStore, drop_content_store
+from deck_schema import ArtIndex, list_deck_files, validate_decks
+from load_deck import iter_deck, load_deck
+from constants import DECKS_DIR, OUTPUT_DIR, SHARD_LEASE_SECONDS, SHARD_RENEW_SECONDS, SHARD_SIZE, STREAM_ASSET_CACHE_SHARE, STREAM_TILE_CACHE_MAX_TILES
+from fonts import clear_fonts
+from manifest import BuildManifest, card_hash, render_settings
+from shard_queue import ShardQueue, worker_id
+from sinks import ArchiveSink, BackgroundWriter, FileSink, SpriteSheetSink
+from tile_cache import tile_cache
+from watch import DEFAULT_POLL_INTERVAL, DependencyIndex, poll
+import profiling
+
+# Decks already loaded by this process (each worker keeps its own)
+_loaded_decks = {}
+
+# Where rendered cards go, how they are encoded, and the content store behind it when deduplicating (--dedupe)
+_sink = None
+_encoder = None
+_scales = None
+_render_scale = 1
+_content_store = None
+
+
+def _get_deck(deck_name, deck_path):
+    if deck_path not in _loaded_decks:
+        # Invalid records (missing art included) were already reported by the validation pass in run()
+        _loaded_decks[deck_path] = load_deck(deck_path, deck_name, errors=[], art_index=ArtIndex())
+    return _loaded_decks[deck_path]
+
+
+def render_cards(deck_name, deck_path, indices=None):
+    """Renders the given cards of a deck (all by default), returning (rendered, failures)
+
+    rendered maps each card index that succeeded to {output path: image digest} (None without --dedupe).
+    A failure is (worker pid, deck name, card index, card label, traceback) so one broken card never aborts the run.
+    """
+    deck = _get_deck(deck_name, deck_path)
+    if indices is None:
+        indices = range(len(deck))
+
+    rendered = {}
+    pending = {}
+    failures = []
+    for index in indices:
+        card = deck[index]
+        label = card.name
+
+        try:
+            logging.info(f"  🎴 Generating card: {card.name}")
+            with profiling.card_scope(f"{deck_name}/{label}"):
+                result = _sink.write(card, card.render(_render_scale))
+
+            # A background writer hands back a future; collect it once the deck is queued
+            if isinstance(result, Future):
+                pending[index] = (label, result)
+            else:
+                rendered[index] = result
+        except Exception:
+            error = traceback.format_exc()
+            logging.error(f"Failed to render {deck_name}/{label}:\n{error}")
+            failures.append((os.getpid(), deck_name, index, label, error))
+
+    for index, (label, future) in pending.items():
+        try:
+            rendered[index] = future.result()
+        except Exception:
+            error = traceback.format_exc()
+            logging.error(f"Failed to write {deck_name}/{label}:\n{error}")
+            failures.append((os.getpid(), deck_name, index, label, error))
+
+    _sink.finish_deck(deck_name)
+    return rendered, failures
+
+
+def plan_deck(deck_name, deck_path, manifest, force=False, indices=None):
+    """Returns {card index: input hash} for the cards of a deck (or just the given indices) that need rendering"""
+    deck = _get_deck(deck_name, deck_path)
+    if indices is None:
+        indices = range(len(deck))
+
+    stale = {}
+    for index in indices:
+        card = deck[index]
+        digest = card_hash(card, _render_settings())
+        if force or not _sink.incremental or not manifest.is_up_to_date(_sink.path_for(card), digest):
+            stale[index] = digest
+
+    skipped = len(indices) - len(stale)
+    if skipped:
+        logging.info(f"  ⏭️ {skipped} card(s) unchanged in {deck_name}, skipping")
+    return stale
+
+
+def _render_settings():
+    return render_settings(_encoder, _scales, _render_scale, _content_store is not None)
+
+
+def _record_card(manifest, output_path, digest, result):
+    manifest.record(output_path, digest)
+    if _content_store is not None:
+        for scaled_path, image_digest in result.items():
+            _content_store.record(scaled_path, image_digest)
+
+
+def record_results(manifest, deck_name, deck_path, stale, rendered):
+    """Stores the hash of every card that rendered, and drops the ones that failed"""
+    if not _sink.incremental:
+        return
+    deck = _get_deck(deck_name, deck_path)
+
+    for index, digest in stale.items():
+        output_path = _sink.path_for(deck[index])
+        if index in rendered:
+            _record_card(manifest, output_path, digest, rendered[index])
+        else:
+            manifest.forget(output_path)
+
+
+def _configure(args):
+    """Applies the render options to this process (the parent, or a worker)"""
+    global _sink, _encoder, _scales, _render_scale, _content_store
+    _encoder = args.encoder
+    _scales = args.scales
+    _render_scale = args.render_scale
+    _content_store = ContentStore() if args.dedupe else None
+    if args.sprite_sheet:
+        _sink = SpriteSheetSink(encoder=_encoder, columns=args.sheet_columns, rows_per_page=args.sheet_rows)
+    elif args.archive:
+        _sink = ArchiveSink(encoder=_encoder, scales=_scales, format=args.archive, checksums=args.archive_checksums)
+    else:
+        _sink = FileSink(store=_content_store, encoder=_encoder, scales=_scales)
+    if args.background_writer:
+        _sink = BackgroundWriter(_sink)
+    set_compositor(args.compositor)
+
+    if args.profile:
+        capture_dir = os.path.splitext(args.profile)[0] + ".cards"
+        profiling.enable(keep_events=args.profile_format == "chrome", capture=args.profile_capture, capture_dir=capture_dir)
+
+
+def _init_worker(log_queue, args):
+    """Routes worker logs through the parent and warms the caches once per process"""
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+
+    _configure(args)
+    Card.warm_caches(args.render_scale)
+
+    if args.profile:
+        # Each worker leaves its own part behind when the pool shuts it down; the parent merges them
+        part_path = f"{args.profile}.{os.getpid()}.part"
+        multiprocessing.util.Finalize(None, profiling.export, args=(part_path, args.profile_format), exitpriority=10)
+
+
+def render_parallel(deck_files, manifest, args):
+    """Spreads cards (or whole decks) across a pool of worker processes"""
+    tasks = []
+    plans = {}
+    for deck_name, deck_path in deck_files:
+        logging.info(f"📜 Queueing deck: {deck_name} from {os.path.basename(deck_path)}")
+        stale = plans[deck_path] = plan_deck(deck_name, deck_path, manifest, args.force)
+
+        if not stale:
+            continue
+        if args.unit == "deck":
+            tasks.append((deck_name, deck_path, sorted(stale)))
+        else:
+            tasks += [(deck_name, deck_path, [index]) for index in sorted(stale)]
+
+    if not tasks:
+        return []
+
+    rendered = defaultdict(dict)
+    log_queue = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers)
+    listener.start()
+
+    failures = []
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker, initargs=(log_queue, args)) as pool:
+            futures = {pool.submit(render_cards, *task): task for task in tasks}
+            for future in as_completed(futures):
+                try:
+                    task_rendered, task_failures = future.result()
+                    rendered[futures[future][1]].update(task_rendered)
+                    failures += task_failures
+                except Exception:
+                    # The worker itself died (e.g. could not load the deck)
+                    deck_name, _, indices = futures[future]
+                    error = traceback.format_exc()
+                    failures += [(None, deck_name, index, f"#{index}", error) for index in indices]
+    finally:
+        listener.stop()
+
+    for deck_name, deck_path in deck_files:
+        record_results(manifest, deck_name, deck_path, plans[deck_path], rendered[deck_path])
+    manifest.save()
+
+    return failures
+
+
+def render_sequential(deck_files, manifest, force=False):
+    """Renders every deck in this process"""
+    Card.warm_caches(_render_scale)
+
+    failures = []
+    try:
+        for deck_name, deck_path in deck_files:
+            logging.info(f"📜 Loading deck: {deck_name} from {os.path.basename(deck_path)}")
+            stale = plan_deck(deck_name, deck_path, manifest, force)
+
+            rendered, deck_failures = render_cards(deck_name, deck_path, sorted(stale))
+            record_results(manifest, deck_name, deck_path, stale, rendered)
+            manifest.checkpoint()
+
+            failures += deck_failures
+            _loaded_decks.pop(deck_path, None)
+    finally:
+        manifest.save()
+
+    return failures
+
+
+def apply_memory_budget(budget_mb):
+    """Caps the process-wide caches so they fit in a share of what the budget leaves after start-up"""
+    # The interpreter, Pillow and the fonts are already resident and don't shrink, so only the rest is shared out
+    available_mb = max(budget_mb - (profiling.peak_rss_mb() or 0), 0)
+    asset_cache.resize(int(available_mb * 1024 * 1024 * STREAM_ASSET_CACHE_SHARE))
+    tile_cache.resize(STREAM_TILE_CACHE_MAX_TILES)
+    # Mapped store pages count as resident memory outside the cache's cap; pread copies go through the cache
+    set_store_mapping(False)
+
+
+def render_streaming(deck_files, manifest, force=False):
+    """Renders every deck one card at a time as its file is parsed, so memory stays flat however large the corpus
+
+    No deck is held as a list: each record is decoded, checked against the manifest, rendered, written and
+    recorded, and its card and image are dropped before the next record is read.
+    """
+    Card.warm_caches(_render_scale)
+    settings = _render_settings()
+
+    failures = []
+    try:
+        for deck_name, deck_path in deck_files:
+            logging.info(f"📜 Streaming deck: {deck_name} from {os.path.basename(deck_path)}")
+            pending = []
+            skipped = 0
+
+            # Invalid records (missing art included) were already reported by the validation pass in run()
+            for index, card in enumerate(iter_deck(deck_path, deck_name, errors=[], art_index=ArtIndex())):
+                label = card.name
+                output_path = _sink.path_for(card)
+                digest = card_hash(card, settings) if _sink.incremental else None
+                if not force and digest is not None and manifest.is_up_to_date(output_path, digest):
+                    skipped += 1
+                    continue
+
+                try:
+                    logging.info(f"  🎴 Generating card: {label}")
+                    with profiling.card_scope(f"{deck_name}/{label}"):
+                        result = _sink.write(card, card.render(_render_scale))
+                except Exception:
+                    error = traceback.format_exc()
+                    logging.error(f"Failed to render {deck_name}/{label}:\n{error}")
+                    failures.append((os.getpid(), deck_name, index, label, error))
+                    manifest.forget(output_path)
+                    continue
+
+                # Only the future (a few names and digests) outlives the card; the writer's queue is bounded
+                if isinstance(result, Future):
+                    pending.append((index, label, output_path, digest, result))
+                elif digest is not None:
+                    _record_card(manifest, output_path, digest, result)
+
+            for index, label, output_path, digest, future in pending:
+                try:
+                    result = future.result()
+                except Exception:
+                    error = traceback.format_exc()
+                    logging.error(f"Failed to write {deck_name}/{label}:\n{error}")
+                    failures.append((os.getpid(), deck_name, index, label, error))
+                    manifest.forget(output_path)
+                    continue
+                if digest is not None:
+                    _record_card(manifest, output_path, digest, result)
+
+            if skipped:
+                logging.info(f"  ⏭️ {skipped} card(s) unchanged in {deck_name}, skipping")
+            _sink.finish_deck(deck_name)
+            manifest.checkpoint()
+    finally:
+        manifest.save()
+
+    return failures
+
+
+def _shard_settings():
+    return {"render": _render_settings(), "dedupe": _content_store is not None}
+
+
+def _output_key(path):
+    # Hosts may mount output/ in different places, so shard records use paths relative to it
+    return os.path.relpath(path, OUTPUT_DIR).replace(os.sep, "/")
+
+
+def write_shards(deck_files, manifest, queue_dir, shard_size=SHARD_SIZE, force=False):
+    """Plans the build and writes the stale cards as a shard queue for --shard-worker processes"""
+    jobs = []
+    for deck_name, deck_path in deck_files:
+        stale = plan_deck(deck_name, deck_path, manifest, force)
+        jobs += [(os.path.basename(deck_path), index) for index in sorted(stale)]
+        _loaded_decks.pop(deck_path, None)
+
+    count = ShardQueue(queue_dir).create(jobs, _shard_settings(), shard_size)
+    logging.info(f"🧩 Wrote {len(jobs)} card(s) as {count} shard(s) to {queue_dir}")
+
+
+def run_shard_worker(queue_dir):
+    """Claims shards from the queue and renders them until none are left, returning the failures"""
+    queue = ShardQueue(queue_dir)
+    if queue.settings != _shard_settings():
+        raise ValueError(f"The render options differ from the ones {queue_dir} was planned with; "
+                         f"start every worker with the same options as --write-shards")
+
+    Card.warm_caches(_render_scale)
+    worker = worker_id()
+    settings = _render_settings()
+
+    failures = []
+    while (shard := queue.claim(worker)) is not None:
+        logging.info(f"🧩 {worker} claimed shard {shard['id']} ({len(shard['jobs'])} card(s))")
+        by_deck = defaultdict(list)
+        for deck_file, index in shard["jobs"]:
+            by_deck[deck_file].append(index)
+
+        cards = []
+        shard_failures = []
+        stop_renewing = queue.keep_alive(shard["id"], SHARD_RENEW_SECONDS)
+        try:
+            for deck_file, indices in by_deck.items():
+                deck_name, deck_path = os.path.splitext(deck_file)[0], os.path.join(DECKS_DIR, deck_file)
+                deck = _get_deck(deck_name, deck_path)
+
+                # The deck may have been edited since the queue was planned
+                missing = [index for index in indices if index >= len(deck)]
+                shard_failures += [(worker, deck_name, index, f"#{index}", "Card no longer in the deck") for index in missing]
+
+                rendered, deck_failures = render_cards(deck_name, deck_path, [index for index in indices if index < len(deck)])
+                for index, result in rendered.items():
+                    card = deck[index]
+                    cards.append({
+                        "deck": deck_file,
+                        "index": index,
+                        "output": _output_key(_sink.path_for(card)),
+                        "hash": card_hash(card, settings),
+                        "images": {_output_key(path): digest for path, digest in result.items()} if result else None,
+                    })
+                shard_failures += [(worker, *failure[1:]) for failure in deck_failures]
+
+                _loaded_decks.pop(deck_path, None)
+        finally:
+            stop_renewing.set()
+
+        queue.complete(shard["id"], {"worker": worker, "cards": cards, "failures": shard_failures})
+        failures += shard_failures
+
+    logging.info(f"🧩 No shards left in {queue_dir}")
+    return failures
+
+
+def merge_shards(queue_dir, manifest, lease_seconds=SHARD_LEASE_SECONDS):
+    """Re-queues expired leases and records every finished shard in the build manifest
+
+    Returns (failures, unfinished shard count). Safe to run again while workers are still busy.
+    """
+    queue = ShardQueue(queue_dir)
+    for shard_id in queue.requeue_expired(lease_seconds):
+        logging.warning(f"⏰ Lease on shard {shard_id} expired, re-queued it")
+
+    content_store = _content_store
+    if queue.settings["dedupe"] and content_store is None:
+        content_store = ContentStore()
+
+    failures = []
+    for record in queue.completed():
+        for card in record["cards"]:
+            manifest.record(os.path.join(OUTPUT_DIR, card["output"]), card["hash"])
+            if content_store is not None and card["images"]:
+                for path, digest in card["images"].items():
+                    content_store.record(os.path.join(OUTPUT_DIR, path), digest)
+        failures += [tuple(failure) for failure in record["failures"]]
+    manifest.save()
+
+    done, leased, pending = queue.status()
+    if content_store is not None:
+        # Objects of unfinished shards aren't in the index yet, so only prune once everything is in
+        if not leased and not pending:
+            content_store.prune()
+        content_store.save()
+    logging.info(f"🧩 {done}/{done + leased + pending} shard(s) done, {leased} leased, {pending} waiting for a worker")
+    return failures, leased + pending
+
+
+def _invalidate_caches(changes, dependencies):
+    """Drops whatever the in-memory caches derived from changed assets; everything else stays warm"""
+    # Tiles are drawn from mechanic, cost and defeat banner images
+    tile_cache.clear()
+
+    if changes & dependencies.font_paths:
+        clear_fonts()
+
+    for atlas in loaded_atlases():
+        if os.path.abspath(atlas.path) in changes:
+            atlas.invalidate()
+
+
+def apply_changes(changes, dependencies, manifest):
+    """Re-renders the cards affected by a set of changed files, returning the failures"""
+    deck_files = {os.path.abspath(deck_path): (deck_name, deck_path) for deck_name, deck_path in list_deck_files()}
+    deck_changes = {path for path in changes if path.endswith(".json") and os.path.dirname(path) == os.path.abspath(DECKS_DIR)}
+    asset_changes = changes - deck_changes
+
+    if asset_changes:
+        _invalidate_caches(asset_changes, dependencies)
+
+    # An edited deck is reloaded; the manifest then picks out the records that actually changed
+    targets = {}
+    for path in deck_changes:
+        for loaded_path in [p for p in _loaded_decks if os.path.abspath(p) == path]:
+            del _loaded_decks[loaded_path]
+        if path not in deck_files:
+            dependencies.remove_deck(path)
+            continue
+
+        deck_name, deck_path = deck_files[path]
+        for error in validate_decks([(deck_name, deck_path)]):
+            logging.error(f"❌ {error}")
+        dependencies.add_deck(path, _get_deck(deck_name, deck_path))
+        targets[path] = None
+
+    # A changed asset only concerns the cards that read it, e.g. one mechanic icon or one deck's atlas
+    for path, indices in dependencies.affected(asset_changes).items():
+        if path in deck_files and path not in targets:
+            targets[path] = None if not _sink.incremental else indices
+
+    failures = []
+    for path, indices in targets.items():
+        deck_name, deck_path = deck_files[path]
+        stale = plan_deck(deck_name, deck_path, manifest, indices=sorted(indices) if indices is not None else None)
+        if not stale:
+            continue
+
+        logging.info(f"🔁 Re-rendering {len(stale)} card(s) in {deck_name}")
+        rendered, deck_failures = render_cards(deck_name, deck_path, sorted(stale))
+        record_results(manifest, deck_name, deck_path, stale, rendered)
+        failures += deck_failures
+
+    manifest.save()
+    if _content_store is not None:
+        _content_store.save()
+    return failures
+
+
+def watch(manifest, interval=DEFAULT_POLL_INTERVAL):
+    """Keeps this process (and its caches) alive, re-rendering what each change to decks/ or assets/ affects"""
+    Card.warm_caches(_render_scale)
+
+    dependencies = DependencyIndex()
+    for deck_name, deck_path in list_deck_files():
+        dependencies.add_deck(os.path.abspath(deck_path), _get_deck(deck_name, deck_path))
+
+    logging.info("👀 Watching decks/ and assets/ for changes (Ctrl+C to stop)")
+    try:
+        for changes in poll(interval):
+            logging.info(f"✏️ {len(changes)} file(s) changed")
+            failures = apply_changes(changes, dependencies, manifest)
+            if failures:
+                report_failures(failures)
+    except KeyboardInterrupt:
+        logging.info("👋 Stopped watching")
+
+
+def report_failures(failures):
+    """Logs a summary of failed cards grouped by the worker that hit them"""
+    by_worker = defaultdict(list)
+    for pid, deck_name, _, label, error in failures:
+        by_worker[pid].append((deck_name, label, error))
+
+    logging.error(f"❌ {len(failures)} card(s) failed to render")
+    for pid, worker_failures in sorted(by_worker.items(), key=lambda item: item[0] or 0):
+        logging.error(f"  Worker {pid if pid is not None else '(crashed)'}: {len(worker_failures)} failure(s)")
+        for deck_name, label, error in worker_failures:
+            logging.error(f"    {deck_name}/{label}: {error.strip().splitlines()[-1]}")
+
+
+def report_peak_memory(budget_mb):
+    peak = profiling.peak_rss_mb()
+    if peak is None:
+        logging.info("🧠 Peak memory can't be measured on this platform")
+    elif peak > budget_mb:
+        logging.warning(f"⚠️ Peak memory {peak:.1f} MiB went over the {budget_mb} MiB budget")
+    else:
+        logging.info(f"🧠 Peak memory {peak:.1f} MiB (budget {budget_mb} MiB)")
+
+
+def save_profile(path, format):
+    """Writes this process's profile, or merges the parts left by the pool workers"""
+    part_paths = profiling.worker_export_paths(path)
+    if part_paths:
+        profiling.merge_exports(path, part_paths, format)
+        for part_path in part_paths:
+            os.remove(part_path)
+    else:
+        profiling.export(path, format)
+    logging.info(f"📈 Saved profile to {path}")
+
+
+def run(args):
+    """Renders every deck with the options parsed by main.py, returning the exit status"""
+    deck_files = list_deck_files()
+
+    if (args.sprite_sheet or args.archive) and args.dedupe:
+        logging.warning(f"⚠️ --dedupe has no effect with {'--sprite-sheet' if args.sprite_sheet else '--archive'}")
+    if args.sprite_sheet or args.archive:
+        # A deck's sheet or archive has to be written by a single process
+        args.unit = "deck"
+    if args.stream and args.jobs > 1:
+        logging.warning("⚠️ --stream renders in this process, ignoring --jobs")
+
+    # Check every deck up front, so schema problems show up before any rendering time is spent
+    validation_errors = validate_decks(deck_files)
+    for error in validation_errors:
+        logging.error(f"❌ {error}")
+
+    if args.compile_assets:
+        written = compile_asset_store()
+        logging.info(f"🗜️ Compiled {written} assets into the asset store" if written else "🗜️ Asset store is up to date")
+    manifest = BuildManifest()
+    _configure(args)
+
+    if args.write_shards:
+        write_shards(deck_files, manifest, args.write_shards, args.shard_size, args.force)
+        return 1 if validation_errors else 0
+
+    unfinished = 0
+    if args.shard_worker or args.merge_shards:
+        try:
+            if args.shard_worker:
+                failures = run_shard_worker(args.shard_worker)
+            else:
+                failures, unfinished = merge_shards(args.merge_shards, manifest, args.lease_seconds)
+        except (OSError, ValueError) as e:
+            logging.error(f"❌ Can't use the shard queue: {e}")
+            return 1
+    elif args.stream:
+        apply_memory_budget(args.memory_budget)
+        failures = render_streaming(deck_files, manifest, args.force)
+    elif args.jobs > 1:
+        failures = render_parallel(deck_files, manifest, args)
+    else:
+        failures = render_sequential(deck_files, manifest, args.force)
+
+    if args.watch:
+        if failures:
+            report_failures(failures)
+        watch(manifest, args.watch_interval)
+    _sink.close()
+
+    # Only the coordinator writes the index for shard queues (merge_shards already did)
+    if _content_store is not None and not (args.shard_worker or args.merge_shards):
+        _content_store.prune()
+        _content_store.save()
+    elif not (args.dedupe or args.sprite_sheet or args.archive or args.shard_worker or args.merge_shards):
+        # The outputs were just re-written as standalone files, so an older --dedupe index describes nothing
+        removed = drop_content_store()
+        if removed:
+            logging.info(f"🗃️ Removed the --dedupe content store ({removed} unused image(s))")
+
+    if args.profile:
+        save_profile(args.profile, args.profile_format)
+
+    if args.stream:
+        report_peak_memory(args.memory_budget)
+
+    if failures:
+        report_failures(failures)
+    if validation_errors:
+        logging.error(f"❌ {len(validation_errors)} deck validation error(s), the affected cards were skipped")
+    return 1 if failures or validation_errors or unfinished else 0
+
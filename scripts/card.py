@@ -15,212 +15,213 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
-import logging
+from io import BytesIO
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import os
 from constants import *
-from scripts.utils import sanitize_filename
-
-
-class Card:
-    CARD_WIDTH, CARD_HEIGHT = 284, 493
-    COST_ICON_WIDTH, COST_ICON_HEIGHT = 128, 128
-    SUIT_ICON_WIDTH, SUIT_ICON_HEIGHT = 64, 64
-    NAME_BANNER_WIDTH, NAME_BANNER_HEIGHT = 256, 64
-    DEFEAT_BANNER_WIDTH, DEFEAT_BANNER_HEIGHT = 64, 64
-
-    def __init__(self, name, art, type_, cost, health, effects, taunt=False, deck_name=None, display_name=None):
-        self.name = name
-        self.display_name = display_name
-        self.art_filename = art                  # Just the filename, full path handled separately
-        self.type = type_
-        self.cost = cost
-        self.health = health
-        self.effects = effects
-        self.taunt = taunt
-        self.deck_name = deck_name.lower() if deck_name else None
-        self.atlas = get_deck_atlas(self.deck_name) if self.deck_name else None
-
-        # Paths
-        self.PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-        self.ASSETS_DIR = os.path.join(self.PROJECT_ROOT, '../assets')
-        self.OUTPUT_DIR = os.path.join(self.PROJECT_ROOT, '../output')
-        self.FONT_PATH = os.path.join(self.ASSETS_DIR, 'fonts', 'ProseAntique-Regular.ttf')
+from asset_cache import load_masked_art
+from atlas import get_generic_atlas, load_deck_atlas
+from compositor import composite
+from card_model import CardModel
+from sinks import FileSink
+from fonts import get_font, warm_fonts
+from layout import DEFAULT_LAYOUT, Layout
+from profiling import span
+from tile_cache import tile_cache
+
+
+class Card(CardModel):
+    """A card that can draw itself: every layer is loaded, drawn and composited here"""
+    __slots__ = ()
 
     @staticmethod
-    def from_json(data, deck_name=None):
-        """Creates a Card object from a JSON dictionary."""
-        required_fields = ["name", "art", "type", "effects"]
-
-        for field in required_fields:
-            if field not in data:
-                logging.warning(f"Missing {field} in card: {data.get('name', 'Unknown Card')}")
-                return None
-
-        return Card(
-            name=data["name"],
-            display_name=data.get("display_name", None),
-            art=data["art"],
-            type_=data["type"],
-            cost=data["cost"],
-            health=data.get("health"),          # Some cards don’t have health
-            effects=data.get("effects", {}),    # Default to empty dictionary if missing
-            taunt=data.get("taunt", False),     # Default False if missing
-            deck_name=deck_name
-        )
-
-    def generate_art(self):
-        """Generates a full card image with all components"""
-        deck_output_dir = os.path.join(self.OUTPUT_DIR, self.deck_name.lower())
-
-        if not os.path.exists(deck_output_dir):
-            os.makedirs(deck_output_dir)
-
-        atlas = self._load_deck_atlas()
-        canvas = Image.new("RGBA", (self.CARD_WIDTH, self.CARD_HEIGHT), (0, 0, 0, 0))
-
-        # Load and paste card components
-        card_frame = self._load_card_frame(atlas)
-        canvas.paste(card_frame, (0, 0))
-
-        card_art = self._load_card_art()
-        canvas.paste(card_art, self._get_art_position(), mask=card_art.split()[3])
-
-        art_frame = self._load_card_frame_image()
-        canvas.paste(art_frame, self._get_art_position(), mask=art_frame.split()[3])
-
-        banner = self._load_banner()
+    def warm_caches(scale=1):
+        """Loads the fonts and every layer shared between cards, e.g. once per worker process"""
+        layout = Layout(scale)
+        warm_fonts([(font_filename, layout.px(size)) for font_filename, size in FONT_FACES])
+
+        shared_layers = [(filename, "L") for filename in CARD_FRAME_MASKS.values()]
+        shared_layers.append((NAME_BANNER, None))
+        shared_layers += [(filename, None) for filename in set(CARD_FRAMES.values())]
+        shared_layers += [(filename, None) for filename in set(CARD_BANNERS.values())]
+        shared_layers += [(filename, None) for filename in CARD_COST_IMAGES.values()]
+        shared_layers += [(filename, None) for filename in AGENT_HEALTH_BANNERS.values()]
+
+        mechanic_layers = list(MECHANIC_BANNERS.values()) + list(MECHANIC_ICONS.values()) + [COMBO_PIP_ICON]
+        shared_layers += [(os.path.join("mechanics", filename), None) for filename in mechanic_layers]
+
+        for filename, mode in shared_layers:
+            path = os.path.join(Card.paths.assets_dir, filename)
+            if os.path.exists(path):
+                layout.image(path, mode)
+
+    def render(self, scale=1):
+        """Renders the full card image with all components and returns it (nothing is written)
+
+        scale renders at a multiple of the 284x493 layout (e.g. 2 for print), with text rasterized at that size.
+        """
+        layout = Layout(scale) if scale != 1 else DEFAULT_LAYOUT
+        layers = self._build_layers(layout)
+        with span("composite"):
+            return composite(layout.point((self.CARD_WIDTH, self.CARD_HEIGHT)), layers)
+
+    def render_bytes(self, format="PNG", scale=1, **params):
+        """Renders the card and returns it encoded in memory (PNG by default)"""
+        image = self.render(scale)
+        buffer = BytesIO()
+        with span("encode"):
+            image.save(buffer, format=format, **params)
+        return buffer.getvalue()
+
+    def generate_art(self, store=None, sink=None, scales=(1.0,), render_scale=1):
+        """Generates a full card image with all components and writes it to output/<deck>/ (or into sink)
+
+        The card is composited once (at render_scale); each extra scale (e.g. 0.5, 0.25) is reduced from
+        the previous size into its own subfolder. With a ContentStore, identical images are stored once and
+        the outputs are linked to them; {output path: digest} is returned in that case.
+        """
+        if sink is None:
+            sink = FileSink(self.paths.output_dir, store, scales=scales)
+        return sink.write(self, self.render(render_scale))
+
+    def _build_layers(self, layout=DEFAULT_LAYOUT):
+        """Returns the card's layers bottom to top as (image, position, masked)"""
+        # Load card components
+        with span("atlas"):
+            atlas = self._load_deck_atlas()
+            card_frame = self._load_card_frame(atlas, layout)
+            suit_icon = self._load_suit_icon(atlas, layout)
+
+        with span("art_mask"):
+            card_art = self._load_card_art(layout)
+
+        with span("frame_layers"):
+            with span("frame_layers/art_frame"):
+                art_frame = self._load_card_frame_image(layout)
+            with span("frame_layers/banner"):
+                banner = self._load_banner(layout)
+
+        with span("text"):
+            with span("text/defeat_banner"):
+                defeat_banner = self._render_defeat_banner(layout)
+            with span("text/name_banner"):
+                name_banner = self._render_name_banner(layout)
+            with span("text/cost_icon"):
+                cost_icon = self._render_cost_icon(layout) if self.cost is not None else None
+
+        layers = [
+            (card_frame, (0, 0), False),
+            (card_art, layout.point(self._get_art_position()), True),
+            (art_frame, layout.point(self._get_art_position()), True),
+        ]
         if banner:
-            canvas.paste(banner, (0, 0), mask=banner.split()[3])
-
-        defeat_banner = self._render_defeat_banner()
+            layers.append((banner, (0, 0), True))
         if defeat_banner:
-            canvas.paste(defeat_banner, self._get_defeat_banner_position(), mask=defeat_banner.split()[3])
-
-        name_banner = self._render_name_banner()
-        canvas.paste(name_banner, self._get_name_banner_position(), mask=name_banner.split()[3])
-
-        if self.cost is not None:
-            cost_icon = self._render_cost_icon()
-            canvas.paste(cost_icon, self._get_cost_icon_position(), mask=cost_icon.split()[3])
+            layers.append((defeat_banner, layout.point(self._get_defeat_banner_position()), True))
+        layers.append((name_banner, layout.point(self._get_name_banner_position()), True))
+        if cost_icon is not None:
+            layers.append((cost_icon, layout.point(self._get_cost_icon_position()), True))
+        layers.append((suit_icon, layout.point(self._get_suit_icon_position()), True))
 
-        suit_icon = self._load_suit_icon(atlas)
-        canvas.paste(suit_icon, self._get_suit_icon_position(), mask=suit_icon.split()[3])
+        with span("mechanics"):
+            self._add_mechanic_layers(layers, layout)
 
-        left_positions, right_positions, mechanics = self._get_mechanic_position(self.effects)
+        return layers
 
-        for mechanic in mechanics:
-            mechanic_canvas = self._render_mechanic_canvas(mechanic)
+    def _add_mechanic_layers(self, layers, layout=DEFAULT_LAYOUT):
+        """Appends a tile for every mechanic, play/while-in-play on the left and combos on the right"""
+        for mechanic, mechanic_position in zip(self.mechanics, self.mechanic_positions):
+            with span("mechanics/tile"):
+                mechanic_canvas = self._render_mechanic_canvas(mechanic, layout)
 
-            mechanic_position = None
+            layers.append((mechanic_canvas, layout.point(mechanic_position), True))
 
-            if mechanic["trigger"] in ["play", "while_in_play"] and left_positions:
-                mechanic_position = left_positions.pop(0)
-            elif mechanic["trigger"] == "combo" and right_positions:
-                mechanic_position = right_positions.pop(0)
-
-            if mechanic_position is None:
-                print(f"Warning: No available positions for mechanic {mechanic}")
-                continue
-
-            canvas.paste(mechanic_canvas, mechanic_position, mask=mechanic_canvas)
-
-        # Save & Show
-        output_path = os.path.join(deck_output_dir, sanitize_filename(f"{self.deck_name.lower()}_{self.name.lower()}.png"))
-        canvas.save(output_path)
+        return layers
 
     def _load_deck_atlas(self):
         if "Curse" in self.type:
-            atlas_filename = get_deck_atlas(DEFAULT_ATLAS_DECK)
-        else:
-            atlas_filename = get_deck_atlas(self.deck_name)
+            return get_generic_atlas()
 
-        atlas_path = os.path.join(self.ASSETS_DIR, "patrons", atlas_filename)
-        return Image.open(atlas_path)
+        if self.deck_atlas is None:
+            self.deck_atlas = load_deck_atlas(self.deck_name)
+        return self.deck_atlas
 
-    def _load_card_art(self):
+    def _load_card_art(self, layout=DEFAULT_LAYOUT):
         """Loads card art with the correct mask applied"""
-        art_path = os.path.join(self.ASSETS_DIR, "cards", self.art_filename)
-        art = Image.open(art_path)
+        art_path = os.path.join(self.paths.assets_dir, "cards", self.art_filename)
 
-        mask_filename = mask_filename = "tributecardframe_agent_mask.dds" if "Agent" in self.type else "tributecardframe_action_mask.dds"
-        mask_path = os.path.join(self.ASSETS_DIR, mask_filename)
-        mask = Image.open(mask_path).convert("L")
-        art.putalpha(mask)
-        return art
+        mask_path = os.path.join(self.paths.assets_dir, self.mask_filename())
+        return load_masked_art(art_path, mask_path, layout.scale)
 
-    def _load_card_frame(self, atlas):
-        """Extracts the main card frame from the deck atlas"""
-        return atlas.crop((0, 0, self.CARD_WIDTH, self.CARD_HEIGHT))
+    def _load_card_frame(self, atlas, layout=DEFAULT_LAYOUT):
+        """Returns the main card frame pre-cropped from the deck atlas"""
+        return atlas.region("frame", layout.scale)
 
-    def _load_card_frame_image(self):
+    def _load_card_frame_image(self, layout=DEFAULT_LAYOUT):
         """Loads the card frame image (Agent/Action frame)"""
-        frame_filename = "tributecardframe_agent.dds" if "Agent" in self.type else "tributecardframe_action.dds"
-        frame_path = os.path.join(self.ASSETS_DIR, frame_filename)
-        return Image.open(frame_path)
+        frame_path = os.path.join(self.paths.assets_dir, self.frame_filename())
+        return layout.image(frame_path)
 
-    def _load_banner(self):
+    def _load_banner(self, layout=DEFAULT_LAYOUT):
         """Loads contract or curse banner"""
-        if "Contract" in self.type or "Curse" in self.type:
-            filename = "tributecardcontractbanner.dds" if "Contract" in self.type else "tributecardcursebanner.dds"
-            path = os.path.join(self.ASSETS_DIR, filename)
-            return Image.open(path).crop((0, 0, self.CARD_WIDTH, self.CARD_HEIGHT))
+        filename = self.banner_filename()
+        if filename is not None:
+            path = os.path.join(self.paths.assets_dir, filename)
+            return layout.image(path).crop((0, 0, layout.px(self.CARD_WIDTH), layout.px(self.CARD_HEIGHT)))
         return None
 
-    def _load_name_banner(self):
+    def _load_name_banner(self, layout=DEFAULT_LAYOUT):
         """Loads the name banner"""
-        path = os.path.join(self.ASSETS_DIR, "tributecardnamebanner.dds")
-        return Image.open(path)
+        path = os.path.join(self.paths.assets_dir, NAME_BANNER)
+        return layout.image(path)
 
-    def _load_cost_icon(self):
+    def _load_cost_icon(self, layout=DEFAULT_LAYOUT):
         """Loads the correct cost icon"""
-        filename = "tributecardcost_contract_1.dds" if "Contract" in self.type else "tributecardcost_1.dds"
-        path = os.path.join(self.ASSETS_DIR, filename)
-        return Image.open(path)
+        path = os.path.join(self.paths.assets_dir, self.cost_filename())
+        return layout.image(path)
 
-    def _load_defeat_banner(self):
+    def _load_defeat_banner(self, layout=DEFAULT_LAYOUT):
         """Loads the defeat banner"""
-        filename = "tributecarddefeatbanner_taunt.dds" if self.taunt else "tributecarddefeatbanner_health.dds"
-        path = os.path.join(self.ASSETS_DIR, filename)
-        return Image.open(path)
+        path = os.path.join(self.paths.assets_dir, self.defeat_banner_filename())
+        return layout.image(path)
 
-    def _load_suit_icon(self, atlas):
-        """Extracts the suit icon from the deck atlas"""
-        return atlas.crop((448, 0, 512, 64))
+    def _load_suit_icon(self, atlas, layout=DEFAULT_LAYOUT):
+        """Returns the suit icon pre-cropped from the deck atlas"""
+        return atlas.region("suit_icon", layout.scale)
 
     def _draw_text(self, draw, text, font_size, position, color, shadow=False):
         """Draws text with an optional shadow"""
-        font = ImageFont.truetype(self.FONT_PATH, font_size)
+        font = get_font(FONT_REGULAR, font_size)
         x, y = position
 
         if shadow:
             draw.text((x + 2, y + 2), text, font=font, fill="black")
         draw.text((x, y), text, font=font, fill=color)
 
-    def _render_name_banner(self):
+    def _render_name_banner(self, layout=DEFAULT_LAYOUT):
         """Creates a separate canvas for the name banner with text"""
         name_text = self.name
         if self.display_name is not None:
             name_text = self.display_name
 
-        banner = self._load_name_banner()
+        banner = self._load_name_banner(layout)
+        banner_width, banner_height = layout.px(self.NAME_BANNER_WIDTH), layout.px(self.NAME_BANNER_HEIGHT)
 
         # Create a new blank canvas for the name banner
-        banner_canvas = Image.new("RGBA", (self.NAME_BANNER_WIDTH, self.NAME_BANNER_HEIGHT), (0, 0, 0, 0))
+        banner_canvas = Image.new("RGBA", (banner_width, banner_height), (0, 0, 0, 0))
         banner_canvas.paste(banner, (0, 0), mask=banner.split()[3])
 
         # Draw the name text on this new canvas
         draw = ImageDraw.Draw(banner_canvas)
-        font_path = os.path.join(self.ASSETS_DIR, 'fonts', 'ProseAntique-Bold.ttf')
-        font = ImageFont.truetype(font_path, 20)
+        font = layout.font(FONT_BOLD, 20)
 
         # Center the text within the banner
         bbox = draw.textbbox((0, 0), name_text, font=font)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
-        text_x = (self.NAME_BANNER_WIDTH - text_width) / 2
-        text_y = (self.NAME_BANNER_HEIGHT // 2) - (text_height // 2) - 13       # TODO: finetune later
+        text_x = (banner_width - text_width) / 2
+        text_y = (banner_height // 2) - (text_height // 2) - layout.px(13)       # TODO: finetune later
 
         draw.text((text_x, text_y), name_text, font=font, fill="black")
 
@@ -228,126 +229,125 @@ class Card:
 
         return banner_canvas
 
-    def _render_cost_icon(self):
+    def _render_cost_icon(self, layout=DEFAULT_LAYOUT):
+        """Returns the cost icon with text, drawn once per (cost icon, value, scale)"""
+        key = ("cost", "Contract" in self.type, self.cost, layout.scale)
+        return tile_cache.get(key, lambda: self._draw_cost_icon(layout))
+
+    def _draw_cost_icon(self, layout=DEFAULT_LAYOUT):
         """Creates a separate canvas for the cost icon with text"""
-        icon = self._load_cost_icon()
+        icon = self._load_cost_icon(layout)
+        icon_width, icon_height = layout.px(self.COST_ICON_WIDTH), layout.px(self.COST_ICON_HEIGHT)
 
         # Create a new blank canvas for the cost icon
-        cost_canvas = Image.new("RGBA", (self.COST_ICON_WIDTH, self.COST_ICON_HEIGHT), (0, 0, 0, 0))
+        cost_canvas = Image.new("RGBA", (icon_width, icon_height), (0, 0, 0, 0))
         cost_canvas.paste(icon, (0, 0), mask=icon.split()[3])
 
         # Draw the cost text on this new canvas
         draw = ImageDraw.Draw(cost_canvas)
-        font = ImageFont.truetype(self.FONT_PATH, 52)
+        font = layout.font(FONT_REGULAR, 52)
 
         # Center the text within the cost icon
         bbox = draw.textbbox((0, 0), str(self.cost), font=font)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
-        text_x = ((self.COST_ICON_WIDTH - text_width) // 2)
-        text_y = (self.COST_ICON_HEIGHT // 2) - (text_height // 2) - 7      # TODO: finetune later
+        text_x = ((icon_width - text_width) // 2)
+        text_y = (icon_height // 2) - (text_height // 2) - layout.px(7)      # TODO: finetune later
 
         # Draw shadow for the text
-        draw.text((text_x + 2, text_y + 2), str(self.cost), font=font, fill="black")
+        shadow = layout.px(2)
+        draw.text((text_x + shadow, text_y + shadow), str(self.cost), font=font, fill="black")
 
         # Draw actual white text on top
         draw.text((text_x, text_y), str(self.cost), font=font, fill="white")
 
         return cost_canvas
 
-    def _render_defeat_banner(self):
+    def _render_defeat_banner(self, layout=DEFAULT_LAYOUT):
         """Creates a separate canvas for the defeat (health) banner with text"""
         if "Agent" not in self.type:
             return None
 
-        banner = self._load_defeat_banner()
+        key = ("defeat", bool(self.taunt), self.health, layout.scale)
+        return tile_cache.get(key, lambda: self._draw_defeat_banner(layout))
+
+    def _draw_defeat_banner(self, layout=DEFAULT_LAYOUT):
+        """Draws the defeat banner plate and health value on a new canvas"""
+        banner = self._load_defeat_banner(layout)
+        banner_width, banner_height = layout.px(self.DEFEAT_BANNER_WIDTH), layout.px(self.DEFEAT_BANNER_HEIGHT)
 
         # Create a new blank canvas for the defeat banner
-        defeat_canvas = Image.new("RGBA", (self.DEFEAT_BANNER_WIDTH, self.DEFEAT_BANNER_HEIGHT), (0, 0, 0, 0))
+        defeat_canvas = Image.new("RGBA", (banner_width, banner_height), (0, 0, 0, 0))
         defeat_canvas.paste(banner, (0, 0), mask=banner.split()[3])
 
         # Draw the defeat cost (health value) on this canvas
         draw = ImageDraw.Draw(defeat_canvas)
-        font = ImageFont.truetype(self.FONT_PATH, 52)
+        font = layout.font(FONT_REGULAR, 52)
 
         health_string = str(self.health)
 
         bbox = draw.textbbox((0, 0), health_string, font=font)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
-        text_x = (self.DEFEAT_BANNER_WIDTH - text_width) // 2
+        text_x = (banner_width - text_width) // 2
         if self.taunt:
-            text_y = (self.DEFEAT_BANNER_HEIGHT // 2) - (text_height // 2) - 7     # TODO: finetune these later
+            text_y = (banner_height // 2) - (text_height // 2) - layout.px(7)     # TODO: finetune these later
         else:
-            text_y = (self.DEFEAT_BANNER_HEIGHT // 2) - (text_height // 2) - 13     # TODO: finetune these later
+            text_y = (banner_height // 2) - (text_height // 2) - layout.px(13)     # TODO: finetune these later
 
-        draw.text((text_x + 2, text_y + 2), health_string, font=font, fill="black")
+        shadow = layout.px(2)
+        draw.text((text_x + shadow, text_y + shadow), health_string, font=font, fill="black")
         draw.text((text_x, text_y), health_string, font=font, fill="white")
 
         # defeat_canvas.show()
 
         return defeat_canvas
 
-    def _render_mechanic_canvas(self, mechanic):
+    def _render_mechanic_canvas(self, mechanic, layout=DEFAULT_LAYOUT):
+        """Returns the 64x64 tile for a mechanic, drawing each distinct tile only once (per scale)"""
+        key = ("mechanic",) + mechanic.tile_key + (layout.scale,)
+        return tile_cache.get(key, lambda: self._draw_mechanic_canvas(mechanic, layout))
+
+    def _draw_mechanic_canvas(self, mechanic, layout=DEFAULT_LAYOUT):
         """Creates a 64x64 effect mechanic canvas with frame, icon, and number"""
-        MECHANIC_SIZE = 64
-        ICON_SIZE = 32
-        PIP_SIZE = 16
-        combo_level = None
-        font_color = "black"
-
-        if "combo" in mechanic["trigger"]:
-            trigger = "combo"
-        else:
-            trigger = mechanic["trigger"]
-
-        if "opponent_" in mechanic["type"]:
-            if mechanic["trigger"] == "play":
-                trigger = "setback_play"
-            elif mechanic["trigger"] == "combo":
-                trigger = "setback_combo"
-            effect_type = mechanic["type"].replace("opponent_", "")
-            font_color = "#8c0808"
-        else:
-            effect_type = mechanic["type"]
-        effect_value = mechanic["value"]
-        combo_level = mechanic.get("combo_level", None)
+        MECHANIC_SIZE = layout.px(64)
+        ICON_SIZE = layout.px(32)
+        PIP_SIZE = layout.px(16)
+        effect_value, font_color, num_pips = mechanic.value, mechanic.font_color, mechanic.num_pips
 
-        frame_filename = MECHANIC_BANNERS.get(trigger)
-        frame_path = os.path.join(self.ASSETS_DIR, 'mechanics', frame_filename)
-        frame = Image.open(frame_path)
+        frame_filename = MECHANIC_BANNERS.get(mechanic.banner)
+        frame_path = os.path.join(self.paths.assets_dir, 'mechanics', frame_filename)
+        frame = layout.image(frame_path)
 
-        icon_filename = MECHANIC_ICONS.get(effect_type)
-        icon_path = os.path.join(self.ASSETS_DIR, 'mechanics', icon_filename)
-        icon = Image.open(icon_path)
+        icon_filename = MECHANIC_ICONS.get(mechanic.icon)
+        icon_path = os.path.join(self.paths.assets_dir, 'mechanics', icon_filename)
+        icon = layout.image(icon_path)
 
         mechanic_canvas = Image.new("RGBA", (MECHANIC_SIZE, MECHANIC_SIZE), (0, 0, 0, 0))
         mechanic_canvas.paste(frame, (0, 0), mask=frame.split()[3])
 
-        icon_x = 3
+        icon_x = layout.px(3)
         icon_y = (MECHANIC_SIZE - ICON_SIZE) // 2
         mechanic_canvas.paste(icon, (icon_x, icon_y), mask=icon.split()[3])
 
         if effect_value is not None:
             effect_text = str(effect_value)
             draw = ImageDraw.Draw(mechanic_canvas)
-            font = ImageFont.truetype(self.FONT_PATH, 35)
+            font = layout.font(FONT_REGULAR, 35)
 
             bbox = draw.textbbox((0, 0), effect_text, font=font)
             text_width = bbox[2] - bbox[0]
             text_height = bbox[3] - bbox[1]
 
-            text_x = (MECHANIC_SIZE - text_width) // 2 + 11         # TODO: finetune later
-            text_y = ((MECHANIC_SIZE - text_height) // 2) - 4       # TODO: finetune later
+            text_x = (MECHANIC_SIZE - text_width) // 2 + layout.px(11)         # TODO: finetune later
+            text_y = ((MECHANIC_SIZE - text_height) // 2) - layout.px(4)       # TODO: finetune later
 
             draw.text((text_x, text_y), effect_text, font=font, fill=font_color)
 
-        if combo_level and combo_level >= 3:
+        if num_pips:
             pip_filename = COMBO_PIP_ICON
-            pip_path = os.path.join(self.ASSETS_DIR, 'mechanics', pip_filename)
-            pip = Image.open(pip_path)
-
-            num_pips = combo_level - 2
+            pip_path = os.path.join(self.paths.assets_dir, 'mechanics', pip_filename)
+            pip = layout.image(pip_path)
 
             if num_pips == 1:
                 pip_x = (MECHANIC_SIZE - PIP_SIZE) // 2
@@ -391,32 +391,11 @@ class Card:
         else:
             return (self.CARD_WIDTH - self.DEFEAT_BANNER_WIDTH) // 2, self._get_name_banner_position()[1] + (self.NAME_BANNER_HEIGHT // 2)
 
-    def _get_mechanic_position(self, effects):
-        """Calculates positions for play/while-in-play (left) and combo (right) mechanics."""
-        MECHANIC_SPACING = 0
-        MECHANIC_START_Y = 134
-
-        left_positions = []
-        right_positions = []
-        left_y = MECHANIC_START_Y
-        right_y = MECHANIC_START_Y
-
-        mechanics = []
-
-        for effect_type, effect_list in effects.items():
-            for effect in effect_list:
-                if effect_type == "while_in_play":
-                    mechanics.append({"trigger": "while_in_play", "type": effect["effect"]["type"], "value": effect["effect"]["value"]})
-                else:
-                    mechanics.append({"trigger": "combo" if "combo" in effect_type else effect_type, "type": effect["type"], "value": effect["value"], "combo_level": int(
-                        effect_type.replace("combo", "")) if "combo" in effect_type else None})
-
-        for mechanic in mechanics:
-            if mechanic["trigger"] in ["play", "while_in_play"]:
-                left_positions.append((6, left_y))
-                left_y += 64 + MECHANIC_SPACING
-            elif mechanic["trigger"] == "combo":
-                right_positions.append((self.CARD_WIDTH - 6 - 64, right_y))
-                right_y += 64 + MECHANIC_SPACING
-
-        return left_positions, right_positions, mechanics
\ No newline at end of file
+
+def render_deck(deck):
+    """Renders a deck one card at a time, yielding (card, image) pairs
+
+    deck can be any iterable of cards (e.g. a generator), so a full deck of images is never held at once.
+    """
+    for card in deck:
+        yield card, card.render()
@@ -0,0 +1,160 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+
+from constants import (AGENT_HEALTH_BANNERS, ASSETS_DIR, CARD_BANNERS, CARD_COST_IMAGES, CARD_FRAME_MASKS, CARD_FRAMES,
+                       COMBO_PIP_ICON, DECK_ATLAS, DEFAULT_ATLAS_DECK, MECHANIC_BANNERS, MECHANIC_ICONS, NAME_BANNER,
+                       OUTPUT_DIR, CardType, get_deck_atlas)
+from deck_schema import validate_card
+from mechanics import mechanic_positions, parse_effects
+from utils import sanitize_filename
+
+
+class CardPaths:
+    """Where cards read assets and write output, shared by every Card instead of copied into each one"""
+    __slots__ = ("assets_dir", "output_dir")
+
+    def __init__(self, assets_dir=ASSETS_DIR, output_dir=OUTPUT_DIR):
+        self.assets_dir = assets_dir
+        self.output_dir = output_dir
+
+
+class CardModel:
+    """A card's data and the files it is drawn from, without Pillow
+
+    Listing, validating and planning builds only need this; card.Card adds the rendering.
+    """
+    CARD_WIDTH, CARD_HEIGHT = 284, 493
+    COST_ICON_WIDTH, COST_ICON_HEIGHT = 128, 128
+    SUIT_ICON_WIDTH, SUIT_ICON_HEIGHT = 64, 64
+    NAME_BANNER_WIDTH, NAME_BANNER_HEIGHT = 256, 64
+    DEFEAT_BANNER_WIDTH, DEFEAT_BANNER_HEIGHT = 64, 64
+
+    # Cards are created by the thousand when loading or diffing decks, so keep instances small
+    __slots__ = ("name", "display_name", "art_filename", "type", "cost", "health", "effects", "taunt",
+                 "deck_name", "atlas", "deck_atlas", "mechanics", "mechanic_positions")
+
+    paths = CardPaths()
+
+    def __init__(self, name, art, type_, cost, health, effects, taunt=False, deck_name=None, display_name=None, deck_atlas=None):
+        self.name = name
+        self.display_name = display_name
+        self.art_filename = art                  # Just the filename, full path handled separately
+        self.type = type_
+        self.cost = cost
+        self.health = health
+        self.effects = effects
+        self.taunt = taunt
+        self.deck_name = deck_name.lower() if deck_name else None
+        self.atlas = get_deck_atlas(self.deck_name) if self.deck_name else None
+        self.deck_atlas = deck_atlas             # DeckAtlas shared by the whole deck, loaded lazily if missing
+
+        # Parsed once here instead of on every render
+        self.mechanics = parse_effects(effects)
+        self.mechanic_positions = mechanic_positions(self.mechanics, self.CARD_WIDTH)
+
+    @classmethod
+    def from_json(cls, data, deck_name=None, deck_atlas=None, validate=True):
+        """Creates a card from a JSON dictionary, raising ValueError if it doesn't match the card schema"""
+        if validate:
+            errors = validate_card(data)
+            if errors:
+                name = data.get("name", "Unknown Card") if isinstance(data, dict) else "Unknown Card"
+                raise ValueError(f"Invalid card {name!r}: {'; '.join(errors)}")
+
+        return cls(
+            name=data["name"],
+            display_name=data.get("display_name", None),
+            art=data["art"],
+            type_=data["type"],
+            cost=data.get("cost"),              # Curse/starter cards have no cost
+            health=data.get("health"),          # Some cards don’t have health
+            effects=data.get("effects", {}),    # Default to empty dictionary if missing
+            taunt=data.get("taunt", False),     # Default False if missing
+            deck_name=deck_name,
+            deck_atlas=deck_atlas
+        )
+
+    def to_json(self):
+        """Returns the card as a JSON dictionary, the inverse of from_json"""
+        data = {
+            "name": self.name,
+            "art": self.art_filename,
+            "type": self.type,
+            "cost": self.cost,
+            "health": self.health,
+            "effects": self.effects,
+            "taunt": self.taunt,
+        }
+        if self.display_name is not None:
+            data["display_name"] = self.display_name
+        return data
+
+    def output_filename(self):
+        """Returns the sanitized file name used for this card in every output"""
+        return sanitize_filename(f"{self.deck_name.lower()}_{self.name.lower()}.png")
+
+    def atlas_path(self):
+        """The patron atlas the card's frame and suit icon are cut from (Curse cards use the generic one)"""
+        if "Curse" in self.type or not self.deck_name:
+            atlas_filename = DECK_ATLAS[DEFAULT_ATLAS_DECK]
+        else:
+            atlas_filename = get_deck_atlas(self.deck_name)
+        return os.path.join(self.paths.assets_dir, "patrons", atlas_filename)
+
+    # The asset files each layer is drawn from; card.Card loads these and asset_paths lists them
+    def mask_filename(self):
+        return CARD_FRAME_MASKS["agent" if "Agent" in self.type else "action"]
+
+    def frame_filename(self):
+        return CARD_FRAMES[CardType(self.type)]
+
+    def banner_filename(self):
+        """The contract/curse banner, None for other cards"""
+        return CARD_BANNERS.get(CardType(self.type))
+
+    def cost_filename(self):
+        return CARD_COST_IMAGES["contract" if "Contract" in self.type else "default"]
+
+    def defeat_banner_filename(self):
+        return AGENT_HEALTH_BANNERS["taunt" if self.taunt else "normal"]
+
+    def asset_paths(self):
+        """Returns every asset file generate_art reads for this card (fonts excluded)"""
+        paths = [
+            self.atlas_path(),
+            os.path.join(self.paths.assets_dir, "cards", self.art_filename),
+            os.path.join(self.paths.assets_dir, self.mask_filename()),
+            os.path.join(self.paths.assets_dir, self.frame_filename()),
+            os.path.join(self.paths.assets_dir, NAME_BANNER),
+        ]
+
+        if self.banner_filename() is not None:
+            paths.append(os.path.join(self.paths.assets_dir, self.banner_filename()))
+        if self.cost is not None:
+            paths.append(os.path.join(self.paths.assets_dir, self.cost_filename()))
+        if "Agent" in self.type:
+            paths.append(os.path.join(self.paths.assets_dir, self.defeat_banner_filename()))
+
+        for mechanic in self.mechanics:
+            paths.append(os.path.join(self.paths.assets_dir, 'mechanics', MECHANIC_BANNERS.get(mechanic.banner)))
+            paths.append(os.path.join(self.paths.assets_dir, 'mechanics', MECHANIC_ICONS.get(mechanic.icon)))
+            if mechanic.num_pips:
+                paths.append(os.path.join(self.paths.assets_dir, 'mechanics', COMBO_PIP_ICON))
+
+        return list(dict.fromkeys(paths))
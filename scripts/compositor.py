@@ -0,0 +1,104 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from PIL import Image
+from constants import COMPOSITORS, DEFAULT_COMPOSITOR
+from profiling import span
+
+# NumPy is optional and slow to import, so it is only loaded once the "numpy" compositor is selected
+np = None
+
+_compositor = DEFAULT_COMPOSITOR
+
+
+def set_compositor(name):
+    """Selects the compositing engine used by composite()"""
+    global _compositor, np
+    if name not in COMPOSITORS:
+        raise ValueError(f"Unknown compositor {name!r}, expected one of {', '.join(COMPOSITORS)}")
+    if name == "numpy" and np is None:
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("The numpy compositor requires NumPy (pip install numpy)") from None
+    _compositor = name
+
+
+def composite(size, layers):
+    """Blends a layer list onto a new transparent RGBA canvas of the given size
+
+    Each layer is (image, position, masked): masked layers are pasted with their own alpha,
+    the others replace the pixels underneath.
+    """
+    if _compositor == "numpy":
+        return composite_numpy(size, layers)
+    return composite_pillow(size, layers)
+
+
+def composite_pillow(size, layers):
+    """Composites with sequential Image.paste calls"""
+    canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+    for image, position, masked in layers:
+        with span("composite/paste"):
+            if masked:
+                # An RGBA mask means "use its alpha band", which saves splitting out a copy of it
+                canvas.paste(image, position, mask=image if image.mode == "RGBA" else image.split()[3])
+            else:
+                canvas.paste(image, position)
+    return canvas
+
+
+def composite_numpy(size, layers):
+    """Composites every layer into one uint8 buffer that becomes the card image without a copy
+
+    Uses the same integer blend as Pillow's paste, out = (dst * (255 - a) + src * a) / 255 rounded
+    the way Pillow rounds it, so the result matches composite_pillow pixel for pixel (tolerance 0).
+    The intermediate sum never exceeds 255 * 255 + 255 + 128, so 16-bit lanes are enough.
+
+    Slower than composite_pillow (about 15 vs 2 ms per card on the bundled decks): each masked layer
+    still takes several whole-array passes, where Image.paste blends in a single C loop.
+    """
+    width, height = size
+    buffer = np.zeros((height, width, 4), dtype=np.uint8)
+
+    for image, (x, y), masked in layers:
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+
+        # Clip the layer to the canvas, like paste does
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + image.width, width), min(y + image.height, height)
+        if left >= right or top >= bottom:
+            continue
+
+        src = np.asarray(image)[top - y:bottom - y, left - x:right - x]
+        dst = buffer[top:bottom, left:right]
+
+        if not masked:
+            dst[...] = src
+            continue
+
+        # Only the alpha band is widened; the uint8 views promote to uint16 in the products
+        alpha = src[..., 3:4].astype(np.uint16)
+        blended = dst * (255 - alpha)
+        blended += src * alpha
+        blended += 128
+        blended += blended >> 8
+        blended >>= 8
+        dst[...] = blended
+
+    return Image.frombuffer("RGBA", size, buffer, "raw", "RGBA", 0, 1)
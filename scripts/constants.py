@@ -16,8 +16,21 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
+import os
 from enum import Enum
 
+# ----------------------------
+# Paths
+# ----------------------------
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DECKS_DIR = os.environ.get("TRIBUTECARDS_DECKS_DIR", os.path.join(SCRIPTS_DIR, '../decks'))
+ASSETS_DIR = os.environ.get("TRIBUTECARDS_ASSETS_DIR", os.path.join(SCRIPTS_DIR, '../assets'))
+OUTPUT_DIR = os.environ.get("TRIBUTECARDS_OUTPUT_DIR", os.path.join(SCRIPTS_DIR, '../output'))
+OBJECTS_DIR = os.path.join(OUTPUT_DIR, '.objects')
+FONTS_DIR = os.path.join(ASSETS_DIR, 'fonts')
+ASSET_STORE_DIR = os.path.join(ASSETS_DIR, '.store')
+BUILD_MANIFEST_PATH = os.path.join(SCRIPTS_DIR, '../build_manifest.json')
+
 # ----------------------------
 # Card Type Enum
 # ----------------------------
@@ -28,6 +41,14 @@ class CardType(Enum):
     CONTRACT_AGENT = "Contract Agent"
     CURSE_ACTION = "Curse Action"
 
+# ----------------------------
+# Mechanic Triggers (effect keys in the deck JSON; comboN maps to COMBO)
+# ----------------------------
+class Trigger(Enum):
+    PLAY = "play"
+    WHILE_IN_PLAY = "while_in_play"
+    COMBO = "combo"
+
 # ----------------------------
 # Card Frame Mapping
 # ----------------------------
@@ -39,6 +60,19 @@ CARD_FRAMES = {
     CardType.CURSE_ACTION: "tributecardframe_action.dds",
 }
 
+# ----------------------------
+# Card Frame Masks (the art is cut to the frame's shape)
+# ----------------------------
+CARD_FRAME_MASKS = {
+    "agent": "tributecardframe_agent_mask.dds",
+    "action": "tributecardframe_action_mask.dds"
+}
+
+# ----------------------------
+# Name Banner (every card)
+# ----------------------------
+NAME_BANNER = "tributecardnamebanner.dds"
+
 # ----------------------------
 # Card Banners (for Contract & Curse cards)
 # ----------------------------
@@ -108,6 +142,55 @@ MECHANIC_BANNERS = {
 # ----------------------------
 COMBO_PIP_ICON = "tributemechaniccombopip_full.dds"
 
+# ----------------------------
+# Fonts
+# ----------------------------
+FONT_REGULAR = "ProseAntique-Regular.ttf"
+FONT_BOLD = "ProseAntique-Bold.ttf"
+
+# Every face & size the renderers draw with, loaded up front by fonts.warm_fonts()
+FONT_FACES = [
+    (FONT_BOLD, 20),        # Name banner
+    (FONT_REGULAR, 35),     # Mechanic values
+    (FONT_REGULAR, 52),     # Cost & defeat values
+]
+
+# ----------------------------
+# Asset Cache
+# ----------------------------
+ASSET_CACHE_MAX_BYTES = 256 * 1024 * 1024      # Decoded pixel bytes kept in memory per process
+TILE_CACHE_MAX_TILES = 1024                     # Rendered mechanic/cost/defeat tiles kept per process
+
+# --stream mode: decoded assets get this share of --memory-budget, the rest is left for the interpreter,
+# fonts, tiles and the card being rendered
+DEFAULT_MEMORY_BUDGET_MB = 256
+STREAM_ASSET_CACHE_SHARE = 0.5
+STREAM_TILE_CACHE_MAX_TILES = 256
+
+# ----------------------------
+# Build Manifest
+# ----------------------------
+MANIFEST_SAVE_SECONDS = 30      # Saved at most this often while rendering (each save rewrites the whole file), and at the end
+
+# ----------------------------
+# Compositing
+# ----------------------------
+COMPOSITORS = ("pillow", "numpy")
+DEFAULT_COMPOSITOR = "pillow"       # "pillow" (sequential paste) or "numpy" (needs NumPy installed)
+
+# ----------------------------
+# Render Server
+# ----------------------------
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024      # Encoded cards kept by scripts/server.py
+SERVER_MAX_PENDING = 32                         # Distinct renders queued before the server answers 503
+
+# ----------------------------
+# Sharded Rendering
+# ----------------------------
+SHARD_SIZE = 50                 # Cards per shard written by --write-shards
+SHARD_LEASE_SECONDS = 600       # A shard whose lease isn't renewed for this long is re-queued by --merge-shards
+SHARD_RENEW_SECONDS = 30        # How often a worker renews the lease of the shard it is rendering
+
 # ----------------------------
 # Deck Atlas Mapping
 # ----------------------------
@@ -128,6 +211,10 @@ DECK_ATLAS = {
     "redeagle": "tributepatronsuitatlas_redeagle_2.dds",
 }
 
+# Regions shared by every patron atlas (left, upper, right, lower)
+ATLAS_FRAME_BOX = (0, 0, 284, 493)
+ATLAS_SUIT_ICON_BOX = (448, 0, 512, 64)
+
 
 def get_deck_atlas(deck_name):
     """Returns the correct atlas filename for the given deck"""
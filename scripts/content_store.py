@@ -0,0 +1,116 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+from constants import OBJECTS_DIR, OUTPUT_DIR
+from encoding import FORMAT_EXTENSIONS, EncoderOptions, encode
+
+
+def image_digest(image, encoder=None):
+    """Hashes the final pixel buffer (and encoder settings), so identical renders share one digest"""
+    encoder = encoder or EncoderOptions()
+    digest = hashlib.sha256(f"{image.mode}:{image.width}x{image.height}:{encoder.signature()}:".encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class ContentStore:
+    """Stores each unique card image once and links the per-card outputs to it
+
+    Objects live in output/.objects/<sha256>.<format>. Every card output is a hardlink to its object
+    (or a copy where the filesystem can't link), and index.json maps each output path to its digest
+    so an upload only needs the unique objects plus the index.
+    """
+
+    def __init__(self, objects_dir=OBJECTS_DIR, output_dir=OUTPUT_DIR):
+        self.objects_dir = objects_dir
+        self.output_dir = output_dir
+        self.index_path = os.path.join(objects_dir, "index.json")
+        self.aliases = {}
+        self._warned_no_links = False
+
+        os.makedirs(objects_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r") as file:
+                self.aliases = json.load(file)
+
+    def object_path(self, digest, extension=".png"):
+        return os.path.join(self.objects_dir, f"{digest}{extension}")
+
+    def write(self, image, output_path, encoder=None):
+        """Saves the image under its digest (once) and links output_path to it, returning the digest"""
+        encoder = encoder or EncoderOptions()
+        digest = image_digest(image, encoder)
+        object_path = self.object_path(digest, encoder.extension)
+
+        if not os.path.exists(object_path):
+            tmp_path = f"{object_path}.{os.getpid()}.tmp"
+            encode(image, tmp_path, encoder)
+            os.replace(tmp_path, object_path)
+
+        # Never write through an existing link: replace the directory entry instead
+        tmp_link = f"{output_path}.{os.getpid()}.tmp"
+        try:
+            os.link(object_path, tmp_link)
+        except OSError:
+            if not self._warned_no_links:
+                logging.warning(f"Hardlinks not supported in {self.output_dir}, copying deduplicated outputs instead")
+                self._warned_no_links = True
+            shutil.copyfile(object_path, tmp_link)
+        os.replace(tmp_link, output_path)
+
+        return digest
+
+    def record(self, output_path, digest):
+        self.aliases[os.path.relpath(output_path, self.output_dir).replace(os.sep, "/")] = digest
+
+    def prune(self):
+        """Deletes objects no output refers to anymore"""
+        in_use = set(self.aliases.values())
+        removed = 0
+        for filename in os.listdir(self.objects_dir):
+            digest, ext = os.path.splitext(filename)
+            if ext in FORMAT_EXTENSIONS.values() and digest not in in_use:
+                os.remove(os.path.join(self.objects_dir, filename))
+                removed += 1
+        return removed
+
+    def save(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.aliases, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+        unique = len(set(self.aliases.values()))
+        logging.info(f"🗃️ {len(self.aliases)} card output(s) backed by {unique} unique image(s)")
+
+
+def drop_content_store(objects_dir=OBJECTS_DIR):
+    """Deletes the content store and its index, returning the number of objects removed
+
+    Outputs that are still hardlinks keep their data; only the store's own names go away.
+    """
+    if not os.path.isdir(objects_dir):
+        return 0
+    removed = sum(1 for filename in os.listdir(objects_dir) if os.path.splitext(filename)[1] in FORMAT_EXTENSIONS.values())
+    shutil.rmtree(objects_dir)
+    return removed
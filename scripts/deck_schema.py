@@ -0,0 +1,279 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+import re
+
+from constants import ASSETS_DIR, DECKS_DIR, CardType, MECHANIC_ICONS
+
+# Deck files are read this many characters at a time
+READ_CHUNK_SIZE = 64 * 1024
+
+EFFECT_KEY_PATTERN = re.compile(r"^(play|while_in_play|combo([2-9]|[1-9][0-9]+))$")
+OPPONENT_PREFIX = "opponent_"
+
+
+class DeckValidationError(ValueError):
+    """One problem with a deck file, located by line number (and card, once the record is known)"""
+
+    def __init__(self, deck_path, line, message, card_name=None):
+        self.deck_path = deck_path
+        self.line = line
+        self.message = message
+        self.card_name = card_name
+        super().__init__(str(self))
+
+    def __str__(self):
+        card = f" {self.card_name!r}:" if self.card_name else ""
+        return f"{self.deck_path}:{self.line}:{card} {self.message}"
+
+
+# ----------------------------
+# Incremental JSON array reader
+# ----------------------------
+def iter_json_array(file, deck_path="<deck>"):
+    """Yields (line, record) for each element of a top-level JSON array, reading the file in chunks
+
+    Only one record is decoded at a time. Malformed JSON raises DeckValidationError with the line it
+    was found on; every record before it has already been yielded.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    line = 1
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos, line
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                if buffer[pos] == "\n":
+                    line += 1
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    def expect(tokens):
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise DeckValidationError(deck_path, line, "Unexpected end of file")
+        if buffer[pos] not in tokens:
+            raise DeckValidationError(deck_path, line, f"Expected {' or '.join(map(repr, tokens))}, found {buffer[pos]!r}")
+        return buffer[pos]
+
+    def expect_end():
+        nonlocal pos
+        pos += 1
+        skip_whitespace()
+        if pos < len(buffer):
+            raise DeckValidationError(deck_path, line, f"Unexpected {buffer[pos]!r} after the closing ']'")
+
+    def element_ended(end):
+        # A number cut off by the chunk boundary ("1." then "5") decodes "successfully" as a shorter one,
+        # so an element only counts once the "," or "]" after it is in the buffer too
+        while end < len(buffer) and buffer[end] in " \t\r\n":
+            end += 1
+        return end < len(buffer) and buffer[end] in ",]"
+
+    expect("[")
+    pos += 1
+    skip_whitespace()
+    if pos < len(buffer) and buffer[pos] == "]":
+        expect_end()
+        return
+
+    while True:
+        skip_whitespace()
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+                if not eof and not element_ended(end):
+                    raise json.JSONDecodeError("Truncated", buffer, end)
+                break
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise DeckValidationError(deck_path, line + buffer.count("\n", pos, e.pos), f"Invalid JSON: {e.msg}")
+                fill()
+
+        yield line, record
+        line += buffer.count("\n", pos, end)
+        pos = end
+
+        if expect(",]") == "]":
+            expect_end()
+            return
+        pos += 1
+
+
+# ----------------------------
+# Card schema
+# ----------------------------
+def _type_name(types):
+    return " or ".join("null" if t is type(None) else t.__name__ for t in types)
+
+
+def _field(name, types, required=True, check=None):
+    """Compiles one record field into a checker that appends error messages"""
+    def validate(record, errors):
+        if name not in record:
+            if required:
+                errors.append(f"Missing required field '{name}'")
+            return
+        value = record[name]
+        # bool is an int subclass, but "cost": true is a typo, not a cost
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            errors.append(f"'{name}' must be {_type_name(types)}, got {json.dumps(value)}")
+            return
+        if check is not None:
+            check(value, errors)
+    return validate
+
+
+def _check_art(value, errors):
+    # Art is a file name inside assets/cards; anything that could point elsewhere on disk is refused
+    if os.path.isabs(value) or "/" in value or os.sep in value or ".." in value:
+        errors.append(f"'art' must be a file name in assets/cards, got {value!r}")
+
+
+def _check_type(value, errors):
+    if value not in CARD_TYPES:
+        errors.append(f"Unknown card type {value!r}, expected one of {', '.join(sorted(CARD_TYPES))}")
+
+
+def _check_mechanic(path, mechanic, errors):
+    if not isinstance(mechanic, dict):
+        errors.append(f"{path} must be an object")
+        return
+
+    mechanic_type = mechanic.get("type")
+    if not isinstance(mechanic_type, str):
+        errors.append(f"{path}.type must be a string")
+    elif mechanic_type.removeprefix(OPPONENT_PREFIX) not in MECHANIC_ICONS:
+        errors.append(f"{path}.type: unknown mechanic {mechanic_type!r}")
+
+    if "value" not in mechanic:
+        errors.append(f"{path}.value is missing")
+    elif isinstance(mechanic["value"], bool) or not isinstance(mechanic["value"], (int, str, type(None))):
+        errors.append(f"{path}.value must be int, string or null, got {json.dumps(mechanic['value'])}")
+
+
+def _check_effects(effects, errors):
+    for key, entries in effects.items():
+        if not EFFECT_KEY_PATTERN.match(key):
+            errors.append(f"Unknown effect key {key!r}, expected play, while_in_play or comboN (N >= 2)")
+            continue
+        if not isinstance(entries, list):
+            errors.append(f"effects.{key} must be a list")
+            continue
+
+        for i, entry in enumerate(entries):
+            path = f"effects.{key}[{i}]"
+            if key == "while_in_play":
+                if not isinstance(entry, dict) or not isinstance(entry.get("trigger"), str) or "effect" not in entry:
+                    errors.append(f"{path} must have a 'trigger' string and an 'effect' object")
+                    continue
+                _check_mechanic(f"{path}.effect", entry["effect"], errors)
+            else:
+                _check_mechanic(path, entry, errors)
+
+
+CARD_TYPES = {card_type.value for card_type in CardType}
+
+# Compiled once: every record runs through the same list of checkers
+CARD_SCHEMA = [
+    _field("name", (str,)),
+    _field("display_name", (str, type(None)), required=False),
+    _field("art", (str,), check=_check_art),
+    _field("type", (str,), check=_check_type),
+    _field("cost", (int, type(None)), required=False),
+    _field("health", (int, type(None)), required=False),
+    _field("taunt", (bool,), required=False),
+    _field("effects", (dict,), check=_check_effects),
+]
+
+
+class ArtIndex:
+    """Art files available under assets/cards, listed once instead of stat-ing every record"""
+
+    def __init__(self, assets_dir=ASSETS_DIR):
+        self.cards_dir = os.path.join(assets_dir, "cards")
+        self._files = None
+
+    def __contains__(self, filename):
+        if self._files is None:
+            self._files = set(os.listdir(self.cards_dir)) if os.path.isdir(self.cards_dir) else set()
+        return filename in self._files
+
+
+def validate_card(record, art_index=None):
+    """Returns every schema error in a card record as messages (empty when valid)"""
+    if not isinstance(record, dict):
+        return [f"Card record must be an object, got {type(record).__name__}"]
+
+    errors = []
+    for validate in CARD_SCHEMA:
+        validate(record, errors)
+
+    art = record.get("art")
+    if art_index is not None and isinstance(art, str) and art not in art_index:
+        errors.append(f"Art file not found: {os.path.join(art_index.cards_dir, art)}")
+    return errors
+
+
+def iter_records(deck_path, errors, art_index=None):
+    """Yields (line, record) for every valid card of a deck, appending a DeckValidationError for each invalid one"""
+    try:
+        with open(deck_path, "r", encoding="utf-8") as file:
+            for line, record in iter_json_array(file, deck_path):
+                messages = validate_card(record, art_index)
+                if not messages:
+                    yield line, record
+                    continue
+
+                name = record.get("name") if isinstance(record, dict) else None
+                errors += [DeckValidationError(deck_path, line, message, name) for message in messages]
+    except DeckValidationError as e:
+        errors.append(e)
+    except OSError as e:
+        errors.append(DeckValidationError(deck_path, 0, f"Cannot read deck: {e.strerror}"))
+
+
+def list_deck_files(decks_dir=DECKS_DIR):
+    """Returns (deck_name, deck_path) for every deck JSON, in a stable order"""
+    deck_files = sorted(f for f in os.listdir(decks_dir) if f.endswith('.json'))
+    return [(os.path.splitext(f)[0], os.path.join(decks_dir, f)) for f in deck_files]
+
+
+def validate_decks(deck_files, check_art=True):
+    """Checks every (deck name, deck path) against the card schema without rendering, returning all errors"""
+    art_index = ArtIndex() if check_art else None
+
+    errors = []
+    for _, deck_path in deck_files:
+        for _ in iter_records(deck_path, errors, art_index):
+            pass
+    return errors
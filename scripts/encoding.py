@@ -0,0 +1,111 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+# Planning a build only needs the encoder signature, so Pillow is imported where an image is actually encoded
+OUTPUT_FORMATS = ("png", "webp", "avif")
+FORMAT_EXTENSIONS = {"png": ".png", "webp": ".webp", "avif": ".avif"}
+
+
+class EncoderOptions:
+    """How rendered cards are encoded: format plus the speed/size knobs for it
+
+    None means "Pillow's default", so EncoderOptions() writes exactly what image.save(path) always did.
+    """
+
+    def __init__(self, format="png", compress_level=None, optimize=False, quantize=False, lossless=True, quality=None, speed=None):
+        if format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {format!r}, expected one of {', '.join(OUTPUT_FORMATS)}")
+        self.format = format
+        self.compress_level = compress_level    # PNG zlib level 0-9
+        self.optimize = optimize                # PNG: extra (slow) compression pass
+        self.quantize = quantize                # PNG: palette output for cards with <= 256 colours
+        self.lossless = lossless                # WebP
+        self.quality = quality                  # WebP (lossy) and AVIF, 0-100
+        self.speed = speed                      # WebP method 0-6, AVIF speed 0-10
+
+    @property
+    def extension(self):
+        return FORMAT_EXTENSIONS[self.format]
+
+    def signature(self):
+        """Everything that changes the encoded bytes, for hashing"""
+        return repr(sorted(vars(self).items()))
+
+    def check_available(self):
+        """Raises if the installed Pillow can't write this format"""
+        from PIL import features
+
+        if self.format == "webp" and not features.check("webp"):
+            raise RuntimeError("This Pillow build has no WebP support")
+        if self.format == "avif" and not features.check("avif"):
+            try:
+                import pillow_avif  # noqa: F401 -- registers the AVIF plugin on older Pillow
+            except ImportError:
+                raise RuntimeError("AVIF output needs Pillow >= 11.2 or the pillow-avif-plugin package")
+
+    def save_params(self):
+        if self.format == "png":
+            params = {"optimize": self.optimize}
+            if self.compress_level is not None:
+                params["compress_level"] = self.compress_level
+            return params
+
+        if self.format == "webp":
+            params = {"lossless": self.lossless}
+            if self.quality is not None:
+                params["quality"] = self.quality
+            if self.speed is not None:
+                params["method"] = self.speed
+            return params
+
+        params = {}
+        if self.quality is not None:
+            params["quality"] = self.quality
+        if self.speed is not None:
+            params["speed"] = self.speed
+        return params
+
+
+ENCODER_PRESETS = {
+    # Fast local iteration: barely compressed PNGs
+    "draft": EncoderOptions(compress_level=1),
+    # Smallest lossless PNGs for the wiki
+    "wiki": EncoderOptions(compress_level=9, optimize=True, quantize=True),
+    "webp": EncoderOptions(format="webp", lossless=True, speed=4),
+    "webp-lossy": EncoderOptions(format="webp", lossless=False, quality=90, speed=4),
+    "avif": EncoderOptions(format="avif", quality=80, speed=6),
+}
+
+
+def _palette_if_lossless(image):
+    """Returns a palette copy of the image when it has <= 256 colours and survives the round trip, else the image"""
+    if image.getcolors(256) is None:
+        return image
+    from PIL import Image
+
+    quantized = image.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    if quantized.convert(image.mode).tobytes() != image.tobytes():
+        return image
+    return quantized
+
+
+def encode(image, fp, options=None):
+    """Encodes the image to a path or file object"""
+    options = options or EncoderOptions()
+    if options.format == "png" and options.quantize:
+        image = _palette_if_lossless(image)
+    image.save(fp, format=options.format.upper(), **options.save_params())
@@ -0,0 +1,45 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+
+from PIL import ImageFont
+from constants import FONTS_DIR, FONT_FACES
+
+# (font filename, size) -> FreeTypeFont, shared by every renderer in the process
+_fonts = {}
+
+
+def get_font(font_filename, size):
+    """Returns the font at the given size, parsing the TTF only the first time it is asked for"""
+    key = (font_filename, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = ImageFont.truetype(os.path.join(FONTS_DIR, font_filename), size)
+        _fonts[key] = font
+    return font
+
+
+def warm_fonts(faces=FONT_FACES):
+    """Loads every declared face up front so the first card doesn't pay for it"""
+    for font_filename, size in faces:
+        get_font(font_filename, size)
+
+
+def clear_fonts():
+    """Drops every loaded face, e.g. after a font file changed"""
+    _fonts.clear()
@@ -0,0 +1,51 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from asset_cache import load_image
+from fonts import get_font
+
+
+class Layout:
+    """Maps the card's 1x pixel layout (284x493, 64px tiles, ...) to a target resolution
+
+    Coordinates and font sizes are multiplied by the scale, so text is rasterized at the target size;
+    bitmaps come from the asset cache already resampled (once per scale). At scale 1 every value
+    passes through unchanged.
+    """
+
+    def __init__(self, scale=1):
+        if scale <= 0:
+            raise ValueError(f"Layout scale must be positive, got {scale}")
+        self.scale = scale
+
+    def px(self, value):
+        """A 1x length or coordinate at this scale"""
+        if self.scale == 1:
+            return value
+        return int(round(value * self.scale))
+
+    def point(self, point):
+        return tuple(self.px(value) for value in point)
+
+    def font(self, font_filename, size):
+        return get_font(font_filename, self.px(size))
+
+    def image(self, path, mode=None):
+        return load_image(path, mode, self.scale)
+
+
+DEFAULT_LAYOUT = Layout()
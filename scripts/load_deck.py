@@ -16,20 +16,34 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
-import json
+import logging
+
+from atlas import load_deck_atlas
 from card import Card
+from deck_schema import iter_records
+
+
+def iter_deck(deck_path, deck_name, errors, art_index=None):
+    """Yields a deck's valid cards one at a time as the file is parsed
+
+    Every invalid record is skipped and reported in errors (a list of DeckValidationError with line numbers),
+    so one pass over the file finds all of its problems. Art files are checked when art_index is given.
+    """
+    # All cards share one atlas for the deck
+    deck_atlas = load_deck_atlas(deck_name)
+    for _, record in iter_records(deck_path, errors, art_index):
+        yield Card.from_json(record, deck_name, deck_atlas, validate=False)
+
+
+def load_deck(deck_path, deck_name, errors=None, art_index=None):
+    """Loads a deck JSON file and returns a list of its valid Card objects
+
+    Problems are appended to errors when given, otherwise logged. Art files are checked when art_index is given.
+    """
+    deck_errors = [] if errors is None else errors
+    cards = list(iter_deck(deck_path, deck_name, deck_errors, art_index))
 
-def load_deck(deck_path, deck_name):
-    """Loads a deck JSON file and returns a list of Card objects."""
-    try:
-        with open(deck_path, "r") as file:
-            data = json.load(file)
-    except json.JSONDecodeError as e:
-        print(f"❌ Error loading {deck_name}: Invalid JSON format ({e})")
-        return []
-    except FileNotFoundError:
-        print(f"❌ Error: Deck file {deck_path} not found!")
-        return []
-
-    # Convert JSON data to Card objects
-    return [Card.from_json(card, deck_name) for card in data]
\ No newline at end of file
+    if errors is None:
+        for error in deck_errors:
+            logging.error(f"❌ {error}")
+    return cards
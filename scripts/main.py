@@ -15,24 +15,249 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
+import argparse
+import copy
 import logging
 import os
-from load_deck import load_deck
+import sys
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+# Only Pillow-free modules up here: list, validate and plan must start fast (CI jobs, editor hooks),
+# and render imports the renderer (build.py) when it actually runs
+from card_model import CardModel
+from constants import COMPOSITORS, DEFAULT_COMPOSITOR, DEFAULT_MEMORY_BUDGET_MB, SHARD_LEASE_SECONDS, SHARD_SIZE
+from deck_schema import iter_records, list_deck_files, validate_decks
+from encoding import ENCODER_PRESETS, OUTPUT_FORMATS, EncoderOptions
+from manifest import BuildManifest, card_hash, render_settings
+from scaling import parse_scales
+from sinks import ARCHIVE_FORMATS, FileSink
+from watch import DEFAULT_POLL_INTERVAL
+import profiling
 
-if __name__ == "__main__":
-    deck_files = [f for f in os.listdir('decks') if f.endswith('.json')]
+LOG_FORMAT = "%(levelname)s: %(message)s"
+COMMANDS = ("list", "validate", "plan", "render")
+
+
+def list_decks(show_cards=False):
+    """Prints every deck with its number of valid cards (and their names with show_cards)"""
+    for deck_name, deck_path in list_deck_files():
+        errors = []
+        names = [record["name"] for _, record in iter_records(deck_path, errors)]
+        invalid = f", {len(errors)} error(s)" if errors else ""
+        print(f"{deck_name:<16} {len(names):>4} card(s){invalid}  {os.path.relpath(deck_path)}")
+        if show_cards:
+            for name in names:
+                print(f"    {name}")
+    return 0
+
+
+def validate(check_art=True):
+    """Checks every deck against the card schema, returning 1 when anything is invalid"""
+    deck_files = list_deck_files()
+    errors = validate_decks(deck_files, check_art)
+    for error in errors:
+        logging.error(f"❌ {error}")
+    logging.info(f"🔎 Checked {len(deck_files)} deck(s): {len(errors)} error(s)")
+    return 1 if errors else 0
+
+
+def plan(args):
+    """Prints the cards `render` would draw with the same options, without rendering (or importing Pillow)"""
+    manifest = BuildManifest()
+    settings = render_settings(args.encoder, args.scales, args.render_scale, args.dedupe)
+    # Sprite sheets and archives are rewritten whole, so they always render every card
+    outputs = FileSink(encoder=args.encoder, scales=args.scales) if not (args.sprite_sheet or args.archive) else None
+
+    stale = total = 0
+    errors = []
+    for deck_name, deck_path in list_deck_files():
+        for _, record in iter_records(deck_path, errors):
+            card = CardModel.from_json(record, deck_name, validate=False)
+            total += 1
+            if args.force or outputs is None or not manifest.is_up_to_date(outputs.path_for(card), card_hash(card, settings)):
+                print(f"{deck_name}/{card.name}")
+                stale += 1
+
+    logging.info(f"🗺️ {stale} of {total} card(s) would be rendered")
+    if errors:
+        logging.warning(f"⚠️ Invalid records would be skipped ({len(errors)} schema error(s)), run `validate` for details")
+    return 0
+
+
+def encoder_from_args(args):
+    """Builds the encoder options from --preset, then the individual encoder flags on top"""
+    encoder = copy.copy(ENCODER_PRESETS[args.preset]) if args.preset else EncoderOptions()
+    if args.format:
+        encoder.format = args.format
+    if args.compress_level is not None:
+        encoder.compress_level = args.compress_level
+    if args.optimize:
+        encoder.optimize = True
+    if args.quantize:
+        encoder.quantize = True
+    if args.lossy:
+        encoder.lossless = False
+    if args.quality is not None:
+        encoder.quality = args.quality
+    if args.encoder_speed is not None:
+        encoder.speed = args.encoder_speed
+    return encoder
+
+
+def _output_options():
+    """Options that change what gets rendered, shared by plan and render"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--force", action="store_true",
+                        help="re-render every card, even those unchanged since the last build")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS,
+                        help="output image format (default: png, or the preset's format)")
+    parser.add_argument("--preset", choices=sorted(ENCODER_PRESETS),
+                        help="encoder settings bundle: draft (fast PNGs), wiki (smallest PNGs), webp, webp-lossy, avif")
+    parser.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9",
+                        help="PNG zlib compression level (lower is faster, bigger)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="extra PNG compression pass (slow)")
+    parser.add_argument("--quantize", action="store_true",
+                        help="write palette PNGs for cards with at most 256 colours (lossless)")
+    parser.add_argument("--lossy", action="store_true",
+                        help="lossy WebP instead of lossless")
+    parser.add_argument("--quality", type=int, metavar="0-100",
+                        help="WebP/AVIF quality")
+    parser.add_argument("--encoder-speed", type=int, metavar="N",
+                        help="WebP method (0-6) or AVIF speed (0-10), higher is faster")
+    parser.add_argument("--render-scale", type=float, default=1, metavar="N",
+                        help="render at N times the 284x493 layout, e.g. 2 or 4 for print and high-DPI "
+                             "displays; text is rasterized at that size (default: 1)")
+    parser.add_argument("--scales", type=parse_scales, default=[1.0],
+                        help="comma-separated output scales, e.g. 1,0.5,0.25; smaller sizes go to "
+                             "output/<deck>/<percent>pct/ (default: 1)")
+    parser.add_argument("--sprite-sheet", action="store_true",
+                        help="pack each deck into sprite sheet pages with a JSON index (output/sheets/<deck>/) "
+                             "instead of one file per card")
+    parser.add_argument("--sheet-columns", type=int, default=10, metavar="N",
+                        help="cards per sprite sheet row (default: 10)")
+    parser.add_argument("--sheet-rows", type=int, metavar="N",
+                        help="rows per sprite sheet page (default: one sheet per deck)")
+    parser.add_argument("--archive", choices=ARCHIVE_FORMATS,
+                        help="stream each deck's cards into one archive (output/archives/<deck>.<format>) "
+                             "instead of one file per card")
+    parser.add_argument("--archive-checksums", action="store_true",
+                        help="add a SHA256SUMS entry to every --archive")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="store identical images once (output/.objects) and hardlink the card outputs to them")
+    return parser
 
-    for deck_file in deck_files:
-        deck_name = os.path.splitext(deck_file)[0]
-        deck_path = os.path.join('decks', deck_file)
 
-        logging.info(f"📜 Loading deck: {deck_name} from {deck_file}")
+def _add_render_options(parser):
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="number of worker processes (default: 1, render in this process)")
+    parser.add_argument("--unit", choices=["card", "deck"], default="card",
+                        help="how work is split between workers (default: card)")
+    parser.add_argument("--watch", action="store_true",
+                        help="after the build, keep running and re-render the cards affected by each change "
+                             "to decks/*.json or assets/ (in this process, with warm caches)")
+    parser.add_argument("--watch-interval", type=float, default=DEFAULT_POLL_INTERVAL, metavar="SECONDS",
+                        help=f"how often --watch polls for changes (default: {DEFAULT_POLL_INTERVAL})")
+    parser.add_argument("--stream", action="store_true",
+                        help="render one card at a time as each deck file is parsed, with the caches capped "
+                             "by --memory-budget, for very large deck corpora (in this process)")
+    parser.add_argument("--memory-budget", type=int, default=DEFAULT_MEMORY_BUDGET_MB, metavar="MB",
+                        help=f"memory --stream aims to stay under; peak usage is reported at the end "
+                             f"(default: {DEFAULT_MEMORY_BUDGET_MB})")
+    shards = parser.add_mutually_exclusive_group()
+    shards.add_argument("--write-shards", metavar="DIR",
+                        help="plan the build and write the stale cards as a shard queue in DIR (on a filesystem "
+                             "every worker host shares) instead of rendering")
+    shards.add_argument("--shard-worker", metavar="DIR",
+                        help="claim shards from the queue in DIR and render them until none are left; start "
+                             "any number of these, with the same render options as --write-shards")
+    shards.add_argument("--merge-shards", metavar="DIR",
+                        help="re-queue shards whose lease expired and record the finished ones in the build manifest")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, metavar="N",
+                        help=f"cards per shard for --write-shards (default: {SHARD_SIZE})")
+    parser.add_argument("--lease-seconds", type=float, default=SHARD_LEASE_SECONDS, metavar="SECONDS",
+                        help=f"how long --merge-shards lets a shard go without a lease renewal "
+                             f"(default: {SHARD_LEASE_SECONDS})")
+    parser.add_argument("--compositor", choices=COMPOSITORS, default=DEFAULT_COMPOSITOR,
+                        help=f"layer compositing engine; numpy gives identical output but is several times slower "
+                             f"than pillow and needs NumPy installed (default: {DEFAULT_COMPOSITOR})")
+    parser.add_argument("--background-writer", action="store_true",
+                        help="encode and write on a background thread while the next card composites")
+    parser.add_argument("--compile-assets", action="store_true",
+                        help="pre-convert the DDS assets into the memory-mapped asset store first (skipped when up to date)")
+    parser.add_argument("--profile", metavar="FILE", default=os.environ.get("TRIBUTECARDS_PROFILE"),
+                        help="record stage timings and cache counters to FILE (or set TRIBUTECARDS_PROFILE)")
+    parser.add_argument("--profile-format", choices=profiling.PROFILE_FORMATS,
+                        default=os.environ.get("TRIBUTECARDS_PROFILE_FORMAT", "json"),
+                        help="plain JSON summary or a Chrome trace with every span (default: json)")
+    parser.add_argument("--profile-capture", choices=profiling.CAPTURE_MODES,
+                        default=os.environ.get("TRIBUTECARDS_PROFILE_CAPTURE"),
+                        help="also save a cProfile dump, or the tracemalloc peak, for every card")
 
-        deck = load_deck(deck_path, deck_name)
 
-        for card in deck:
-            logging.info(f"  🎴 Generating card: {card.name}")
-            card.generate_art()
\ No newline at end of file
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Tales of Tribute card images")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    list_parser = commands.add_parser("list", help="list the decks and how many valid cards each has")
+    list_parser.add_argument("--cards", action="store_true", help="also list every card")
+
+    validate_parser = commands.add_parser("validate", help="check every deck against the card schema, then exit")
+    validate_parser.add_argument("--no-art-check", dest="check_art", action="store_false",
+                                 help="don't check that every card's art file exists")
+
+    output_options = _output_options()
+    commands.add_parser("plan", parents=[output_options],
+                        help="dry run: list the cards `render` would draw with the same options")
+    render_parser = commands.add_parser("render", parents=[output_options],
+                                        help="render the cards (the default command)")
+    _add_render_options(render_parser)
+
+    # `main.py --jobs 8` keeps meaning `main.py render --jobs 8`
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv.insert(0, "render")
+
+    args = parser.parse_args(argv)
+    if args.command not in ("plan", "render"):
+        return args
+
+    if args.render_scale <= 0:
+        parser.error("--render-scale must be positive")
+    if args.sprite_sheet and args.archive:
+        parser.error("--sprite-sheet and --archive are different outputs, pick one")
+    if args.archive_checksums and not args.archive:
+        parser.error("--archive-checksums needs --archive")
+    args.encoder = encoder_from_args(args)
+    if args.command == "plan":
+        return args
+
+    if args.memory_budget <= 0:
+        parser.error("--memory-budget must be positive")
+    if args.stream and args.watch:
+        parser.error("--stream can't be combined with --watch, which keeps every deck loaded")
+    if args.shard_size <= 0:
+        parser.error("--shard-size must be positive")
+    sharded = args.write_shards or args.shard_worker or args.merge_shards
+    if sharded and (args.sprite_sheet or args.archive or args.watch or args.stream):
+        parser.error("shard queues can't be combined with --sprite-sheet, --archive, --watch or --stream")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "list":
+        return list_decks(args.cards)
+    if args.command == "validate":
+        return validate(args.check_art)
+    if args.command == "plan":
+        return plan(args)
+
+    args.encoder.check_available()
+    import build    # The renderer: Pillow, the caches and the worker pool
+    return build.run(args)
+
+
+if __name__ == "__main__":
+    # Setup logging
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    sys.exit(main())
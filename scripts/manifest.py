@@ -0,0 +1,128 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+
+from constants import BUILD_MANIFEST_PATH, FONT_FACES, FONTS_DIR, MANIFEST_SAVE_SECONDS, OUTPUT_DIR, SCRIPTS_DIR
+
+MANIFEST_VERSION = 1
+
+# Every module that decides the pixels or bytes of an output. Listed by file rather than found through the
+# imports, so planning a build never imports the Pillow renderer; add new render modules here
+RENDERER_SOURCES = (
+    "card.py", "card_model.py", "mechanics.py", "layout.py", "constants.py",    # Layers and layout
+    "atlas.py", "asset_cache.py", "asset_store.py", "fonts.py",                # Decoded, cropped and masked assets
+    "compositor.py", "scaling.py", "encoding.py", "sinks.py",                  # Blending, resampling and writing
+)
+
+# (path, mtime, size) -> sha256 of the file, so each input is read once per run
+_file_hashes = {}
+
+
+def _hash_file(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+def render_settings(encoder, scales, render_scale, dedupe):
+    """Everything besides the card itself that changes its output, passed to card_hash as extra
+
+    dedupe is in here because it changes what the output files are (hardlinks into the content store or
+    standalone files), so switching it re-writes every card.
+    """
+    return f"{encoder.signature()}:{scales}:{render_scale}:{dedupe}"
+
+
+def card_hash(card, extra=""):
+    """Hashes everything a card's output depends on: its record, assets, fonts, the renderer itself
+    and extra (e.g. the encoder settings)"""
+    # Inherited too: the constants live on CardModel, which planning uses without the renderer
+    card_class = type(card)
+    layout = {name: getattr(card_class, name) for name in dir(card_class) if name.isupper()}
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(card.to_json(), sort_keys=True).encode("utf-8"))
+    digest.update(json.dumps({"deck": card.deck_name, "layout": layout, "fonts": FONT_FACES, "extra": extra}, sort_keys=True).encode("utf-8"))
+
+    # The renderer source covers the inline layout tweaks that aren't class constants
+    input_paths = card.asset_paths()
+    input_paths += [os.path.join(FONTS_DIR, font_filename) for font_filename, _ in FONT_FACES]
+    input_paths += [os.path.join(SCRIPTS_DIR, filename) for filename in RENDERER_SOURCES]
+
+    for path in sorted(set(input_paths)):
+        digest.update(f"{os.path.basename(path)}:{_hash_file(path)}".encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Content hashes of the last successful render of every card, saved next to output/"""
+
+    def __init__(self, path=BUILD_MANIFEST_PATH):
+        self.path = path
+        self.cards = {}
+        self._saved_at = time.monotonic()
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as file:
+                    data = json.load(file)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.cards = data.get("cards", {})
+            except (json.JSONDecodeError, OSError) as e:
+                logging.warning(f"Ignoring unreadable build manifest {path} ({e})")
+
+    @staticmethod
+    def _key(output_path):
+        return os.path.relpath(output_path, OUTPUT_DIR).replace(os.sep, "/")
+
+    def is_up_to_date(self, output_path, digest):
+        """True when the output was rendered from exactly these inputs and still exists"""
+        return self.cards.get(self._key(output_path)) == digest and os.path.exists(output_path)
+
+    def record(self, output_path, digest):
+        self.cards[self._key(output_path)] = digest
+
+    def forget(self, output_path):
+        self.cards.pop(self._key(output_path), None)
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"version": MANIFEST_VERSION, "cards": self.cards}, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._saved_at = time.monotonic()
+
+    def checkpoint(self, interval=MANIFEST_SAVE_SECONDS):
+        """Saves if the last save is more than interval seconds old, so an interrupted run keeps most of its progress"""
+        if time.monotonic() - self._saved_at >= interval:
+            self.save()
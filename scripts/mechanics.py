@@ -0,0 +1,90 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from typing import NamedTuple
+
+from constants import Trigger
+
+OPPONENT_PREFIX = "opponent_"
+SETBACK_COLOR = "#8c0808"
+
+MECHANIC_SIZE = 64
+MECHANIC_SPACING = 0
+MECHANIC_START_Y = 134
+MECHANIC_MARGIN_X = 6
+
+
+class Mechanic(NamedTuple):
+    """One effect of a card, parsed once from the deck JSON"""
+    trigger: Trigger
+    type: str                   # As written in the deck, e.g. "opponent_gain_coin"
+    value: object
+    combo_level: object         # N of "comboN", None otherwise
+    banner: str                 # MECHANIC_BANNERS key, e.g. "setback_combo"
+    icon: str                   # MECHANIC_ICONS key, e.g. "gain_coin"
+    font_color: str
+    num_pips: int
+
+    @property
+    def tile_key(self):
+        """Everything the mechanic's tile looks like, for the tile cache"""
+        return self.banner, self.icon, self.font_color, self.value, self.num_pips
+
+
+def make_mechanic(trigger, mechanic_type, value, combo_level=None):
+    banner = trigger.value
+    icon = mechanic_type
+    font_color = "black"
+
+    if mechanic_type.startswith(OPPONENT_PREFIX):
+        if trigger is not Trigger.WHILE_IN_PLAY:
+            banner = f"setback_{trigger.value}"
+        icon = mechanic_type[len(OPPONENT_PREFIX):]
+        font_color = SETBACK_COLOR
+
+    num_pips = combo_level - 2 if combo_level and combo_level >= 3 else 0
+    return Mechanic(trigger, mechanic_type, value, combo_level, banner, icon, font_color, num_pips)
+
+
+def parse_effects(effects):
+    """Turns a card's "effects" object into a tuple of Mechanics, in deck order"""
+    mechanics = []
+    for key, entries in effects.items():
+        for entry in entries:
+            if key == "while_in_play":
+                effect = entry["effect"]
+                mechanics.append(make_mechanic(Trigger.WHILE_IN_PLAY, effect["type"], effect["value"]))
+            elif key.startswith("combo"):
+                mechanics.append(make_mechanic(Trigger.COMBO, entry["type"], entry["value"], int(key[len("combo"):])))
+            else:
+                mechanics.append(make_mechanic(Trigger(key), entry["type"], entry["value"]))
+    return tuple(mechanics)
+
+
+def mechanic_positions(mechanics, card_width):
+    """Returns the 1x tile position of each mechanic: play/while-in-play down the left, combos down the right"""
+    left_y = right_y = MECHANIC_START_Y
+
+    positions = []
+    for mechanic in mechanics:
+        if mechanic.trigger is Trigger.COMBO:
+            positions.append((card_width - MECHANIC_MARGIN_X - MECHANIC_SIZE, right_y))
+            right_y += MECHANIC_SIZE + MECHANIC_SPACING
+        else:
+            positions.append((MECHANIC_MARGIN_X, left_y))
+            left_y += MECHANIC_SIZE + MECHANIC_SPACING
+    return tuple(positions)
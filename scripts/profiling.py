@@ -0,0 +1,238 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import cProfile
+import glob
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+from time import perf_counter
+
+from utils import sanitize_filename
+
+try:
+    import resource
+except ImportError:     # Not available on Windows
+    resource = None
+
+PROFILE_FORMATS = ("json", "chrome")
+CAPTURE_MODES = ("cprofile", "tracemalloc")
+
+
+class Recorder:
+    """Collects stage timings, counters and per-card measurements while profiling is on"""
+
+    def __init__(self, keep_events=False, capture=None, capture_dir=None):
+        self.seconds = defaultdict(float)       # stage -> total seconds
+        self.calls = defaultdict(int)           # stage -> number of spans
+        self.counters = defaultdict(int)
+        self.cards = {}                         # card label -> measurements
+        self.events = [] if keep_events else None
+        self.capture = capture
+        self.capture_dir = capture_dir
+        self.current_card = None
+        self._origin = perf_counter()
+
+    def add(self, stage, start, seconds):
+        self.seconds[stage] += seconds
+        self.calls[stage] += 1
+
+        if self.events is not None:
+            self.events.append({
+                "name": stage,
+                "cat": stage.split("/")[0],
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": seconds * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {"card": self.current_card},
+            })
+
+    def to_json(self):
+        return {
+            "pid": os.getpid(),
+            "stages": {
+                stage: {"total_ms": seconds * 1000, "calls": self.calls[stage]}
+                for stage, seconds in sorted(self.seconds.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            # Slowest first, so outliers are at the top
+            "cards": dict(sorted(self.cards.items(), key=lambda item: -item[1]["ms"])),
+        }
+
+    def to_chrome_trace(self):
+        events = list(self.events or [])
+        end = (perf_counter() - self._origin) * 1e6
+        events += [
+            {"name": name, "ph": "C", "ts": end, "pid": os.getpid(), "args": {"value": value}}
+            for name, value in sorted(self.counters.items())
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.to_json()}
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if _recorder is not None:
+            _recorder.add(self.stage, self.start, perf_counter() - self.start)
+        return False
+
+
+class _CardScope:
+    """Times one card and, if asked, captures a cProfile dump or its tracemalloc peak"""
+
+    def __init__(self, label):
+        self.label = label
+        self.profiler = None
+
+    def __enter__(self):
+        _recorder.current_card = self.label
+
+        if _recorder.capture == "cprofile":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        elif _recorder.capture == "tracemalloc":
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = perf_counter() - self.start
+        recorder = _recorder
+        if recorder is None:
+            return False
+
+        recorder.add("card", self.start, seconds)
+        measurements = {"ms": seconds * 1000}
+
+        if self.profiler is not None:
+            self.profiler.disable()
+            os.makedirs(recorder.capture_dir, exist_ok=True)
+            profile_path = os.path.join(recorder.capture_dir, sanitize_filename(f"{self.label.replace('/', '_')}.prof"))
+            self.profiler.dump_stats(profile_path)
+            measurements["profile"] = profile_path
+        elif recorder.capture == "tracemalloc":
+            measurements["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+
+        recorder.cards[self.label] = measurements
+        recorder.current_card = None
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_recorder = None
+
+
+def span(stage):
+    """Times a block under the given stage name; a shared no-op while profiling is off"""
+    if _recorder is None:
+        return _NULL_SPAN
+    return _Span(stage)
+
+
+def card_scope(label):
+    """Attributes everything inside the block to one card; a shared no-op while profiling is off"""
+    if _recorder is None:
+        return _NULL_SPAN
+    return _CardScope(label)
+
+
+def count(counter, amount=1):
+    """Adds to a counter while profiling is on"""
+    if _recorder is not None:
+        _recorder.counters[counter] += amount
+
+
+def is_enabled():
+    return _recorder is not None
+
+
+def enable(keep_events=False, capture=None, capture_dir=None):
+    """Starts profiling, returning the Recorder everything is added to"""
+    global _recorder
+    if capture not in (None,) + CAPTURE_MODES:
+        raise ValueError(f"Unknown capture mode {capture!r}, expected one of {', '.join(CAPTURE_MODES)}")
+    _recorder = Recorder(keep_events, capture, capture_dir)
+    return _recorder
+
+
+def disable():
+    global _recorder
+    _recorder = None
+
+
+def export(path, format="json", recorder=None):
+    """Writes the recorded profile as plain JSON or as a Chrome trace (chrome://tracing, Perfetto)"""
+    recorder = recorder or _recorder
+    data = recorder.to_chrome_trace() if format == "chrome" else recorder.to_json()
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2)
+
+
+def merge_exports(path, part_paths, format="json"):
+    """Merges the profiles written by several worker processes into one file"""
+    parts = []
+    for part_path in part_paths:
+        with open(part_path, "r") as file:
+            parts.append(json.load(file))
+
+    if format == "chrome":
+        merged = {"traceEvents": [event for part in parts for event in part["traceEvents"]], "displayTimeUnit": "ms",
+                  "otherData": {"workers": [part["otherData"] for part in parts]}}
+    else:
+        merged = {"workers": parts}
+
+    with open(path, "w") as file:
+        json.dump(merged, file, indent=2)
+
+
+def worker_export_paths(path):
+    return sorted(glob.glob(f"{path}.*.part"))
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None where it can't be measured"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
@@ -0,0 +1,69 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import math
+
+from profiling import span
+
+
+def parse_scales(text):
+    """Parses "1,0.5,0.25" into output scales, largest first"""
+    scales = sorted({float(part) for part in text.split(",") if part.strip()}, reverse=True)
+    if not scales or not all(0 < scale <= 1 for scale in scales):
+        raise ValueError(f"Output scales must be in (0, 1], got {text!r}")
+    return scales
+
+
+def scale_dirname(scale):
+    """Subfolder for a scale: full size stays where it always was, thumbnails go to e.g. 50pct/"""
+    return "" if scale == 1 else f"{scale * 100:g}pct"
+
+
+def scaled_size(size, scale):
+    return max(1, math.ceil(size[0] * scale)), max(1, math.ceil(size[1] * scale))
+
+
+def resample(image, scale):
+    """Returns the image resized by scale (Lanczos), or the image itself at scale 1"""
+    if scale == 1:
+        return image
+    from PIL import Image
+
+    with span("resample"):
+        size = (max(1, int(round(image.width * scale))), max(1, int(round(image.height * scale))))
+        return image.resize(size, Image.Resampling.LANCZOS)
+
+
+def downscale_chain(image, scales):
+    """Yields (scale, image) for each scale, largest first, each reduced from the previous size
+
+    Integer steps (e.g. 50% -> 25%) use Image.reduce, a plain box filter; anything else uses Lanczos.
+    """
+    from PIL import Image
+
+    base_size = image.size
+    previous = image
+    for scale in sorted(scales, reverse=True):
+        size = scaled_size(base_size, scale)
+        if size != previous.size:
+            with span("resample"):
+                factor = previous.width / size[0]
+                if factor.is_integer() and scaled_size(previous.size, 1 / factor) == size:
+                    previous = previous.reduce(int(factor))
+                else:
+                    previous = previous.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        yield scale, previous
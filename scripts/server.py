@@ -0,0 +1,256 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlparse
+
+from atlas import load_deck_atlas
+from card import Card
+from constants import DEFAULT_ATLAS_DECK, RENDER_CACHE_MAX_BYTES, SERVER_MAX_PENDING
+from deck_schema import ArtIndex, validate_card
+from encoding import OUTPUT_FORMATS, EncoderOptions, encode
+
+CONTENT_TYPES = {"png": "image/png", "webp": "image/webp", "avif": "image/avif"}
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def _pool_context():
+    # The pool starts from a request thread; forking a multithreaded process can deadlock the child
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _init_worker():
+    Card.warm_caches()
+
+
+def render_card(data, deck_name, scale, format):
+    """Renders one card record to encoded bytes (runs in a pool worker)"""
+    card = Card.from_json(data, deck_name, load_deck_atlas(deck_name), validate=False)
+    options = EncoderOptions(format=format)
+    options.check_available()   # Registers the AVIF plugin in this worker on older Pillow
+    buffer = BytesIO()
+    encode(card.render(scale), buffer, options)
+    return buffer.getvalue()
+
+
+class RenderError(Exception):
+    """A request the service can't render, with the HTTP status to answer it with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class RenderCache:
+    """LRU of encoded results, bounded by total bytes"""
+
+    def __init__(self, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = data
+        self.current_bytes += len(data)
+        while self.current_bytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.current_bytes -= len(old)
+
+
+class RenderService:
+    """Renders card JSON on a bounded process pool, with a result cache and request coalescing
+
+    Identical requests (same canonical card JSON, deck, scale and format) that arrive while one is
+    rendering wait for that render instead of starting their own.
+    """
+
+    def __init__(self, jobs=1, max_pending=SERVER_MAX_PENDING, cache_bytes=RENDER_CACHE_MAX_BYTES):
+        self.pool = ProcessPoolExecutor(max_workers=jobs, mp_context=_pool_context(), initializer=_init_worker)
+        self.cache = RenderCache(cache_bytes)
+        self.art_index = ArtIndex()
+        self.coalesced = 0
+        self._max_pending = max_pending
+        self._in_flight = {}
+        self._lock = threading.RLock()     # A future that is already done runs its callback on the spot
+
+    @staticmethod
+    def cache_key(data, deck_name, scale, format):
+        return json.dumps({"card": data, "deck": deck_name, "scale": scale, "format": format}, sort_keys=True, separators=(",", ":"))
+
+    def render(self, data, deck_name=DEFAULT_ATLAS_DECK, scale=1, format="png"):
+        """Returns the encoded card, raising RenderError for requests that can't be served"""
+        if format not in OUTPUT_FORMATS:
+            raise RenderError(400, f"Unknown format {format!r}, expected one of {', '.join(OUTPUT_FORMATS)}")
+        if not 0 < scale <= 4:
+            raise RenderError(400, "scale must be in (0, 4]")
+        try:
+            EncoderOptions(format=format).check_available()
+        except RuntimeError as e:
+            raise RenderError(400, str(e))
+        errors = validate_card(data, self.art_index)
+        if errors:
+            raise RenderError(400, "; ".join(errors))
+
+        deck_name = deck_name.lower()
+        key = self.cache_key(data, deck_name, scale, format)
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            elif len(self._in_flight) >= self._max_pending:
+                raise RenderError(503, "Too many renders in progress, try again shortly")
+            else:
+                future = self.pool.submit(render_card, data, deck_name, scale, format)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda done: self._finish(key, done))
+
+        try:
+            return future.result()
+        except Exception as e:
+            raise RenderError(500, f"Render failed: {e}")
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if future.exception() is None:
+                self.cache.put(key, future.result())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cache_hits": self.cache.hits,
+                "cache_misses": self.cache.misses,
+                "cache_bytes": self.cache.current_bytes,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+            }
+
+    def close(self):
+        self.pool.shutdown()
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """POST /render?deck=<deck>&scale=<n>&format=<png|webp|avif> with a card JSON body; GET /stats"""
+
+    service = None
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/stats":
+            return self._send_json(404, {"error": "Not found"})
+        self._send_json(200, self.service.stats())
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/render":
+            return self._send_json(404, {"error": "Not found"})
+
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise RenderError(400, "Bad request: negative Content-Length")
+            if length > MAX_BODY_BYTES:
+                raise RenderError(413, "Card JSON too large")
+            data = json.loads(self.rfile.read(length))
+            scale = float(query.get("scale", 1))
+            format = query.get("format", "png")
+        except RenderError as e:
+            return self._send_json(e.status, {"error": str(e)})
+        except ValueError as e:
+            return self._send_json(400, {"error": f"Bad request: {e}"})
+
+        try:
+            body = self.service.render(data, query.get("deck", DEFAULT_ATLAS_DECK), scale, format)
+        except RenderError as e:
+            return self._send_json(e.status, {"error": str(e)})
+
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[format])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.info(f"🌐 {self.address_string()} {format % args}")
+
+
+def make_server(service, host="127.0.0.1", port=8765):
+    """Returns an HTTP server bound to host:port (port 0 picks a free one) serving the given RenderService"""
+    handler = type("BoundRenderHandler", (RenderHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve card renders over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    parser.add_argument("--jobs", "-j", type=int, default=2, help="render worker processes (default: 2)")
+    parser.add_argument("--max-pending", type=int, default=SERVER_MAX_PENDING,
+                        help=f"distinct renders queued before answering 503 (default: {SERVER_MAX_PENDING})")
+    parser.add_argument("--cache-mb", type=int, default=RENDER_CACHE_MAX_BYTES // (1024 * 1024),
+                        help="size of the rendered-card cache in MiB")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    service = RenderService(args.jobs, args.max_pending, args.cache_mb * 1024 * 1024)
+    server = make_server(service, args.host, args.port)
+    logging.info(f"🃏 Rendering cards on http://{args.host}:{server.server_port}/render")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
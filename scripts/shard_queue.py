@@ -0,0 +1,182 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+import socket
+import threading
+import time
+
+QUEUE_VERSION = 1
+
+
+def worker_id():
+    """Names this process in leases and completion records"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _write_json(path, data):
+    # Readers on other hosts must never see a half-written file
+    tmp_path = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(data, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ShardQueue:
+    """Render jobs split into shards, in a directory every worker host can reach
+
+    shards.json lists the shards, each a list of [deck file, card index] jobs. A worker claims a shard by
+    creating leases/<id>.lease with O_EXCL (only one create can win, also across hosts on a shared
+    filesystem), renews it by touching the file while it renders, and finishes it by writing
+    done/<id>.json and removing the lease. A lease that hasn't been renewed within the lease time is
+    deleted by the coordinator, which puts the shard back up for grabs.
+    """
+
+    def __init__(self, queue_dir):
+        self.queue_dir = queue_dir
+        self.manifest_path = os.path.join(queue_dir, "shards.json")
+        self.leases_dir = os.path.join(queue_dir, "leases")
+        self.done_dir = os.path.join(queue_dir, "done")
+        self._manifest = None
+
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            with open(self.manifest_path, "r") as file:
+                manifest = json.load(file)
+            if manifest.get("version") != QUEUE_VERSION:
+                raise ValueError(f"{self.manifest_path} was written by another version of the queue")
+            self._manifest = manifest
+        return self._manifest
+
+    @property
+    def shards(self):
+        return self.manifest["shards"]
+
+    @property
+    def settings(self):
+        """The render settings the jobs were planned with; every worker has to render with the same"""
+        return self.manifest["settings"]
+
+    def create(self, jobs, settings, shard_size):
+        """Writes a new queue of (deck file, card index) jobs, dropping any leases and results of an older one"""
+        os.makedirs(self.leases_dir, exist_ok=True)
+        os.makedirs(self.done_dir, exist_ok=True)
+        for directory in (self.leases_dir, self.done_dir):
+            for filename in os.listdir(directory):
+                os.remove(os.path.join(directory, filename))
+
+        shards = [
+            {"id": f"{number:05d}", "jobs": [list(job) for job in jobs[start:start + shard_size]]}
+            for number, start in enumerate(range(0, len(jobs), shard_size))
+        ]
+        self._manifest = {"version": QUEUE_VERSION, "settings": settings, "shards": shards}
+        _write_json(self.manifest_path, self._manifest)
+        return len(shards)
+
+    def _lease_path(self, shard_id):
+        return os.path.join(self.leases_dir, f"{shard_id}.lease")
+
+    def _done_path(self, shard_id):
+        return os.path.join(self.done_dir, f"{shard_id}.json")
+
+    def claim(self, worker):
+        """Leases the first shard that is neither done nor leased, returning it (None when nothing is left)"""
+        for shard in self.shards:
+            shard_id = shard["id"]
+            if os.path.exists(self._done_path(shard_id)):
+                continue
+            try:
+                fd = os.open(self._lease_path(shard_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, "w") as file:
+                json.dump({"worker": worker, "claimed": time.time()}, file)
+
+            # Another worker may have finished it (and dropped its lease) since the check above
+            if os.path.exists(self._done_path(shard_id)):
+                self.release(shard_id)
+                continue
+            return shard
+        return None
+
+    def renew(self, shard_id):
+        """Tells the coordinator this shard's worker is still alive"""
+        try:
+            os.utime(self._lease_path(shard_id))
+        except FileNotFoundError:
+            pass    # Already re-queued; finishing anyway is harmless, the outputs are the same
+
+    def keep_alive(self, shard_id, interval):
+        """Renews the lease every interval seconds on a background thread, until the returned event is set
+
+        Renewing from a thread keeps the lease alive however long a single card takes to render.
+        """
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(interval):
+                self.renew(shard_id)
+
+        threading.Thread(target=heartbeat, name=f"lease-{shard_id}", daemon=True).start()
+        return stop
+
+    def release(self, shard_id):
+        try:
+            os.remove(self._lease_path(shard_id))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, shard_id, record):
+        """Writes the shard's completion record, then gives up the lease"""
+        _write_json(self._done_path(shard_id), record)
+        self.release(shard_id)
+
+    def requeue_expired(self, lease_seconds, now=None):
+        """Deletes the leases not renewed for lease_seconds, returning the ids of the shards put back"""
+        now = time.time() if now is None else now
+        requeued = []
+        for shard in self.shards:
+            shard_id = shard["id"]
+            try:
+                renewed = os.path.getmtime(self._lease_path(shard_id))
+            except FileNotFoundError:
+                continue
+            if now - renewed > lease_seconds and not os.path.exists(self._done_path(shard_id)):
+                self.release(shard_id)
+                requeued.append(shard_id)
+        return requeued
+
+    def completed(self):
+        """Yields the completion record of every finished shard"""
+        for shard in self.shards:
+            try:
+                with open(self._done_path(shard["id"]), "r") as file:
+                    yield json.load(file)
+            except FileNotFoundError:
+                continue
+
+    def status(self):
+        """Returns (done, leased, pending) shard counts"""
+        done = leased = 0
+        for shard in self.shards:
+            if os.path.exists(self._done_path(shard["id"])):
+                done += 1
+            elif os.path.exists(self._lease_path(shard["id"])):
+                leased += 1
+        return done, leased, len(self.shards) - done - leased
@@ -0,0 +1,345 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import json
+import os
+import queue
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
+from io import BytesIO
+
+from constants import OUTPUT_DIR
+from encoding import EncoderOptions, encode
+from profiling import span
+from scaling import downscale_chain, scale_dirname
+
+ARCHIVE_FORMATS = ("zip", "tar", "tar.gz")
+CHECKSUMS_FILENAME = "SHA256SUMS"
+
+
+class FileSink:
+    """Writes rendered cards to output/<deck>/<sanitized name>.<format>
+
+    Each extra scale (e.g. 0.5) goes to its own subfolder (output/<deck>/50pct/), downscaled from the
+    next larger size rather than rendered again. With a ContentStore, identical images are stored once
+    and the outputs are linked to them.
+    """
+
+    # Each card has its own output, so unchanged cards can be skipped
+    incremental = True
+
+    def __init__(self, output_dir=OUTPUT_DIR, store=None, encoder=None, scales=(1.0,)):
+        self.output_dir = output_dir
+        self.store = store
+        self.encoder = encoder or EncoderOptions()
+        self.scales = sorted(scales, reverse=True)
+
+    def path_for(self, card, scale=None):
+        """The card's output path at a scale (the largest one by default)"""
+        scale = self.scales[0] if scale is None else scale
+        filename = os.path.splitext(card.output_filename())[0] + self.encoder.extension
+        return os.path.join(self.output_dir, card.deck_name.lower(), scale_dirname(scale), filename)
+
+    def write(self, card, image):
+        """Writes one card image at every scale, returning {output path: digest} when deduplicating (None otherwise)"""
+        digests = {}
+        for scale, scaled in downscale_chain(image, self.scales):
+            output_path = self.path_for(card, scale)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+            if self.store is not None:
+                digests[output_path] = self.store.write(scaled, output_path, self.encoder)
+                continue
+
+            # Write beside the target and swap it in, so a deduplicated (hardlinked) output is replaced, not overwritten
+            tmp_path = f"{output_path}.{os.getpid()}.tmp"
+            with span("encode"):
+                encode(scaled, tmp_path, self.encoder)
+            os.replace(tmp_path, output_path)
+
+        return digests if self.store is not None else None
+
+    def finish_deck(self, deck_name):
+        pass
+
+    def close(self):
+        pass
+
+
+class _SheetBuilder:
+    """One deck's sheet in progress: finished rows are kept as strips, cards are pasted in as they arrive"""
+
+    def __init__(self, columns, rows_per_page, cell_size):
+        self.columns = columns
+        self.rows_per_page = rows_per_page
+        self.cell_size = cell_size
+        self.strips = []
+        self.count = 0      # Cards on the current page
+
+    def add(self, image):
+        """Pastes a card into the next cell, returning its (x, y) on the page"""
+        from PIL import Image    # Only sprite sheets draw here; the sinks are imported when planning too
+
+        cell_width, cell_height = self.cell_size
+        row, column = divmod(self.count, self.columns)
+        if column == 0:
+            self.strips.append(Image.new("RGBA", (self.columns * cell_width, cell_height), (0, 0, 0, 0)))
+
+        self.strips[row].paste(image.convert("RGBA"), (column * cell_width, 0))
+        self.count += 1
+        return column * cell_width, row * cell_height
+
+    @property
+    def is_full(self):
+        return self.rows_per_page is not None and self.count == self.columns * self.rows_per_page
+
+    def take_page(self):
+        """Returns the current page as one image and starts an empty one"""
+        from PIL import Image
+
+        cell_width, cell_height = self.cell_size
+        # A single-row page is only as wide as its cards
+        columns = self.columns if len(self.strips) > 1 else self.count
+        page = Image.new("RGBA", (columns * cell_width, len(self.strips) * cell_height), (0, 0, 0, 0))
+        for row, strip in enumerate(self.strips):
+            page.paste(strip, (0, row * cell_height))
+
+        self.strips = []
+        self.count = 0
+        return page
+
+
+class SpriteSheetSink:
+    """Packs every card of a deck into sprite sheet pages on the card grid, for viewers that want one request per deck
+
+    Writes output/sheets/<deck>/page_<n>.<format> and index.json mapping card names to their page & rectangle.
+    Cards are pasted into the page as they are written, and each page is encoded once, when it fills up or
+    the deck is finished. Without rows_per_page every deck gets a single sheet.
+    """
+
+    # A sheet holds the whole deck, so every card is rendered every time
+    incremental = False
+
+    def __init__(self, output_dir=OUTPUT_DIR, encoder=None, columns=10, rows_per_page=None):
+        self.output_dir = os.path.join(output_dir, "sheets")
+        self.encoder = encoder or EncoderOptions()
+        self.columns = columns
+        self.rows_per_page = rows_per_page
+        self._sheets = {}
+        self._indexes = {}
+
+    def path_for(self, card):
+        return os.path.join(self.output_dir, card.deck_name.lower(), "index.json")
+
+    def write(self, card, image):
+        deck = card.deck_name.lower()
+        if deck not in self._sheets:
+            # Cells match the rendered size, which follows the render scale
+            self._sheets[deck] = _SheetBuilder(self.columns, self.rows_per_page, image.size)
+            self._indexes[deck] = {"card_width": image.width, "card_height": image.height, "pages": [], "cards": {}}
+
+        sheet = self._sheets[deck]
+        index = self._indexes[deck]
+        with span("sheet/pack"):
+            x, y = sheet.add(image)
+        index["cards"][card.name] = {"page": len(index["pages"]), "x": x, "y": y, "w": image.width, "h": image.height}
+
+        if sheet.is_full:
+            self._write_page(deck)
+        return None
+
+    def _write_page(self, deck):
+        index = self._indexes[deck]
+        filename = f"page_{len(index['pages'])}{self.encoder.extension}"
+        page_path = os.path.join(self.output_dir, deck, filename)
+        os.makedirs(os.path.dirname(page_path), exist_ok=True)
+
+        page = self._sheets[deck].take_page()
+        tmp_path = f"{page_path}.{os.getpid()}.tmp"
+        with span("encode"):
+            encode(page, tmp_path, self.encoder)
+        os.replace(tmp_path, page_path)
+        index["pages"].append(filename)
+
+    def finish_deck(self, deck_name):
+        """Encodes the deck's last page and writes its index"""
+        deck = deck_name.lower()
+        sheet = self._sheets.get(deck)
+        if sheet is None:
+            return
+        if sheet.count:
+            self._write_page(deck)
+        del self._sheets[deck]
+
+        index = self._indexes.pop(deck)
+        index_path = os.path.join(self.output_dir, deck, "index.json")
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+
+        # Drop pages left over from an earlier, larger build
+        for filename in os.listdir(os.path.dirname(index_path)):
+            if filename.startswith("page_") and filename not in index["pages"]:
+                os.remove(os.path.join(os.path.dirname(index_path), filename))
+
+    def close(self):
+        for deck in list(self._sheets):
+            self.finish_deck(deck)
+
+
+class ArchiveSink:
+    """Streams every card of a deck straight into one archive, output/archives/<deck>.<zip|tar|tar.gz>
+
+    Each card is encoded in memory and appended as an entry named like FileSink's file (the sanitized
+    card name, extra scales in <percent>pct/), so no per-card file is written or read back. With
+    checksums, a SHA256SUMS entry (sha256sum -c format) is added when the deck is finished. The archive
+    is built beside its final path and swapped in once complete.
+    """
+
+    # An archive is rewritten whole, so every card is rendered every time
+    incremental = False
+
+    def __init__(self, output_dir=OUTPUT_DIR, encoder=None, scales=(1.0,), format="zip", checksums=False):
+        if format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format {format!r}, expected one of {', '.join(ARCHIVE_FORMATS)}")
+        self.output_dir = os.path.join(output_dir, "archives")
+        self.encoder = encoder or EncoderOptions()
+        self.scales = sorted(scales, reverse=True)
+        self.format = format
+        self.checksums = checksums
+        self._archives = {}     # deck -> (archive, tmp path, [(entry name, sha256)])
+
+    def archive_path(self, deck_name):
+        return os.path.join(self.output_dir, f"{deck_name.lower()}.{self.format}")
+
+    def path_for(self, card):
+        return self.archive_path(card.deck_name)
+
+    def entry_name(self, card, scale=None):
+        """The card's name inside the archive at a scale (the largest one by default)"""
+        scale = self.scales[0] if scale is None else scale
+        filename = os.path.splitext(card.output_filename())[0] + self.encoder.extension
+        return "/".join(part for part in (scale_dirname(scale), filename) if part)
+
+    def _open(self, deck):
+        if deck not in self._archives:
+            archive_path = self.archive_path(deck)
+            os.makedirs(self.output_dir, exist_ok=True)
+            tmp_path = f"{archive_path}.{os.getpid()}.tmp"
+            if self.format == "zip":
+                # Cards are already compressed images, deflating them again only costs time
+                archive = zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED)
+            else:
+                archive = tarfile.open(tmp_path, "w:gz" if self.format == "tar.gz" else "w")
+            self._archives[deck] = (archive, tmp_path, [])
+        return self._archives[deck]
+
+    def _add(self, archive, name, data):
+        if isinstance(archive, zipfile.ZipFile):
+            info = zipfile.ZipInfo(name, time.localtime()[:6])
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            archive.addfile(info, BytesIO(data))
+
+    def write(self, card, image):
+        archive, _, checksums = self._open(card.deck_name.lower())
+        for scale, scaled in downscale_chain(image, self.scales):
+            buffer = BytesIO()
+            with span("encode"):
+                encode(scaled, buffer, self.encoder)
+            data = buffer.getvalue()
+
+            name = self.entry_name(card, scale)
+            with span("archive"):
+                self._add(archive, name, data)
+            if self.checksums:
+                checksums.append((name, hashlib.sha256(data).hexdigest()))
+        return None
+
+    def finish_deck(self, deck_name):
+        """Adds the checksum manifest, closes the deck's archive and moves it into place"""
+        deck = deck_name.lower()
+        if deck not in self._archives:
+            return
+        archive, tmp_path, checksums = self._archives.pop(deck)
+        if self.checksums:
+            lines = "".join(f"{digest}  {name}\n" for name, digest in checksums)
+            self._add(archive, CHECKSUMS_FILENAME, lines.encode("utf-8"))
+        archive.close()
+        os.replace(tmp_path, self.archive_path(deck))
+
+    def close(self):
+        for deck in list(self._archives):
+            self.finish_deck(deck)
+
+
+class BackgroundWriter:
+    """Runs another sink's writes on a worker thread so encoding overlaps compositing the next card
+
+    write() returns a Future with the sink's result. At most max_pending images wait in the queue,
+    which bounds memory when rendering outpaces encoding.
+    """
+
+    def __init__(self, sink, max_pending=4):
+        self.sink = sink
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="card-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def incremental(self):
+        return self.sink.incremental
+
+    def path_for(self, card):
+        return self.sink.path_for(card)
+
+    def _submit(self, func, *args):
+        future = Future()
+        self._queue.put((func, args, future))
+        return future
+
+    def write(self, card, image):
+        return self._submit(self.sink.write, card, image)
+
+    def finish_deck(self, deck_name):
+        """Runs after every write already queued for the deck"""
+        self._submit(self.sink.finish_deck, deck_name).result()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            func, args, future = item
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def close(self):
+        """Waits for every queued write, then closes the wrapped sink"""
+        self._queue.put(None)
+        self._thread.join()
+        self.sink.close()
@@ -0,0 +1,106 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+
+from PIL import Image, ImageDraw, ImageFont
+from constants import *
+
+# Sizes of the real ESO textures, so layouts and crops behave the same
+CARD_ART_SIZE = (256, 512)
+BANNER_SIZE = (512, 512)
+ATLAS_SIZE = (512, 512)
+NAME_BANNER_SIZE = (256, 64)
+COST_ICON_SIZE = (128, 128)
+DEFEAT_BANNER_SIZE = (64, 64)
+MECHANIC_FRAME_SIZE = (64, 64)
+MECHANIC_ICON_SIZE = (32, 32)
+COMBO_PIP_SIZE = (16, 16)
+
+
+def _placeholder(name, size, mode="RGBA"):
+    """A deterministic gradient tinted by the file name, with a soft-edged alpha"""
+    seed = hashlib.sha256(name.encode("utf-8")).digest()
+    gradient = Image.linear_gradient("L").resize(size)
+
+    if mode == "L":
+        return gradient
+
+    tint = Image.new("RGB", size, tuple(seed[:3]))
+    image = Image.blend(tint, Image.merge("RGB", (gradient, gradient.rotate(90).resize(size), gradient)), 0.5).convert("RGBA")
+
+    alpha = Image.new("L", size, 0)
+    inset = max(1, min(size) // 8)
+    ImageDraw.Draw(alpha).rounded_rectangle((inset, inset, size[0] - inset, size[1] - inset), radius=inset, fill=255)
+    image.putalpha(alpha)
+    return image
+
+
+def _save_dds(image, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        image.save(path, format="DDS", pixel_format="DXT5")
+    except (TypeError, ValueError, OSError):
+        # Older Pillow can only write uncompressed DDS
+        image.save(path, format="DDS")
+
+
+def generate_asset_pack(assets_dir, decks_dir=DECKS_DIR):
+    """Writes placeholder DDS textures and a free font for every asset the decks reference"""
+    layers = {filename: (CARD_ART_SIZE, "L") for filename in CARD_FRAME_MASKS.values()}
+    layers[NAME_BANNER] = (NAME_BANNER_SIZE, "RGBA")
+    layers.update({filename: (CARD_ART_SIZE, "RGBA") for filename in CARD_FRAMES.values()})
+    layers.update({filename: (BANNER_SIZE, "RGBA") for filename in CARD_BANNERS.values()})
+    layers.update({filename: (COST_ICON_SIZE, "RGBA") for filename in CARD_COST_IMAGES.values()})
+    layers.update({filename: (DEFEAT_BANNER_SIZE, "RGBA") for filename in AGENT_HEALTH_BANNERS.values()})
+    layers.update({os.path.join("mechanics", filename): (MECHANIC_FRAME_SIZE, "RGBA") for filename in MECHANIC_BANNERS.values()})
+    layers.update({os.path.join("mechanics", filename): (MECHANIC_ICON_SIZE, "RGBA") for filename in MECHANIC_ICONS.values()})
+    layers[os.path.join("mechanics", COMBO_PIP_ICON)] = (COMBO_PIP_SIZE, "RGBA")
+    layers.update({os.path.join("patrons", filename): (ATLAS_SIZE, "RGBA") for filename in DECK_ATLAS.values()})
+
+    for deck_path in glob.glob(os.path.join(decks_dir, "*.json")):
+        with open(deck_path, "r") as file:
+            for card in json.load(file):
+                layers[os.path.join("cards", card["art"])] = (CARD_ART_SIZE, "RGBA")
+
+    for filename, (size, mode) in layers.items():
+        path = os.path.join(assets_dir, filename)
+        if not os.path.exists(path):
+            image = _placeholder(filename, size, mode)
+            _save_dds(image.convert("RGBA") if mode == "L" else image, path)
+
+    # Pillow ships a freely licensed TrueType font; it stands in for both ProseAntique faces
+    font_bytes = ImageFont.load_default(size=20).font_bytes
+    os.makedirs(os.path.join(assets_dir, "fonts"), exist_ok=True)
+    for font_filename in {font_filename for font_filename, _ in FONT_FACES}:
+        with open(os.path.join(assets_dir, "fonts", font_filename), "wb") as file:
+            file.write(font_bytes)
+
+    return len(layers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a placeholder asset pack for testing and benchmarks")
+    parser.add_argument("assets_dir", help="folder to write the asset pack to")
+    args = parser.parse_args()
+
+    count = generate_asset_pack(args.assets_dir)
+    print(f"✅ Wrote {count} placeholder textures to {args.assets_dir}")
@@ -0,0 +1,66 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from collections import OrderedDict
+
+from constants import TILE_CACHE_MAX_TILES
+from profiling import count
+
+
+class TileCache:
+    """LRU cache of rendered tiles (mechanics, cost icons, defeat banners)"""
+
+    def __init__(self, max_tiles=TILE_CACHE_MAX_TILES):
+        self.max_tiles = max_tiles
+        self.hits = 0
+        self.misses = 0
+        self._tiles = OrderedDict()
+
+    def get(self, key, render):
+        """Returns the tile for key, calling render() to draw it on a miss
+
+        Tiles are shared between cards and must only be used as paste sources.
+        """
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            count("tile_cache.hits")
+            return tile
+
+        self.misses += 1
+        count("tile_cache.misses")
+        tile = render()
+        self._tiles[key] = tile
+        self._evict()
+        return tile
+
+    def resize(self, max_tiles):
+        """Changes the size limit, evicting the oldest tiles if the cache is now over it"""
+        self.max_tiles = max_tiles
+        self._evict()
+
+    def clear(self):
+        self._tiles.clear()
+
+    def _evict(self):
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+
+
+# Shared by every Card in the process
+tile_cache = TileCache()
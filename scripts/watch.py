@@ -0,0 +1,113 @@
+"""
+TributeCards - ESO Tales of Tribute Card Generator
+Copyright (C) 2025 Jeffrey C (JeffreyBytes / spazzywit)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import time
+from collections import defaultdict
+
+from constants import ASSET_STORE_DIR, ASSETS_DIR, DECKS_DIR, FONT_FACES, FONTS_DIR
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def scan(decks_dir=DECKS_DIR, assets_dir=ASSETS_DIR):
+    """Returns {path: (mtime_ns, size)} for every deck JSON and every file under assets/ (the asset store excluded)"""
+    snapshot = {}
+    for filename in os.listdir(decks_dir):
+        if filename.endswith(".json"):
+            path = os.path.abspath(os.path.join(decks_dir, filename))
+            stat = os.stat(path)
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+    store_dir = os.path.abspath(ASSET_STORE_DIR)
+    for root, dirs, files in os.walk(os.path.abspath(assets_dir)):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != store_dir]
+        for filename in files:
+            path = os.path.join(root, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue    # Deleted while walking, the next scan sees it gone
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def changed_paths(old, new):
+    """Paths added, removed or modified between two scans"""
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+def poll(interval=DEFAULT_POLL_INTERVAL, decks_dir=DECKS_DIR, assets_dir=ASSETS_DIR):
+    """Yields the set of changed paths every time something changes, forever
+
+    A change is only reported once the files have stopped changing for one interval, so an editor's
+    save (or a batch export of assets) is handled as one change.
+    """
+    snapshot = scan(decks_dir, assets_dir)
+    while True:
+        time.sleep(interval)
+        current = scan(decks_dir, assets_dir)
+        changes = changed_paths(snapshot, current)
+        if not changes:
+            continue
+
+        while True:
+            time.sleep(interval)
+            settled = scan(decks_dir, assets_dir)
+            more = changed_paths(current, settled)
+            if not more:
+                break
+            changes |= more
+            current = settled
+
+        snapshot = current
+        yield changes
+
+
+class DependencyIndex:
+    """Maps every input file to the cards rendered from it, so a change re-renders only those cards"""
+
+    def __init__(self):
+        self._cards = defaultdict(set)      # asset path -> {(deck_path, card index)}
+        self._decks = {}                    # deck_path -> number of cards
+        self.font_paths = {os.path.abspath(os.path.join(FONTS_DIR, font_filename)) for font_filename, _ in FONT_FACES}
+
+    def add_deck(self, deck_path, deck):
+        self.remove_deck(deck_path)
+        self._decks[deck_path] = len(deck)
+        for index, card in enumerate(deck):
+            for path in card.asset_paths():
+                self._cards[os.path.abspath(path)].add((deck_path, index))
+
+    def remove_deck(self, deck_path):
+        if self._decks.pop(deck_path, None) is None:
+            return
+        for cards in self._cards.values():
+            cards -= {card for card in cards if card[0] == deck_path}
+
+    def affected(self, paths):
+        """Returns {deck_path: {card index}} for the cards that read any of the paths"""
+        affected = defaultdict(set)
+        for path in paths:
+            if path in self.font_paths:
+                # Every card draws text
+                for deck_path, count in self._decks.items():
+                    affected[deck_path].update(range(count))
+                continue
+            for deck_path, index in self._cards.get(path, ()):
+                affected[deck_path].add(index)
+        return affected
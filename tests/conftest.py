@@ -0,0 +1,33 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# The scripts import each other by module name, as they do when run from scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+# Renders use a generated placeholder pack (the ESO assets aren't in the repo); constants reads this on import
+ASSETS_DIR = tempfile.mkdtemp(prefix="tributecards-assets-")
+os.environ["TRIBUTECARDS_ASSETS_DIR"] = ASSETS_DIR
+
+TEST_CARD = {"name": "War Song", "art": "war_song.dds", "type": "Action", "cost": None, "health": None,
+             "effects": {"play": [{"type": "gain_power", "value": 1}]}}
+
+
+@pytest.fixture(scope="session")
+def asset_pack(tmp_path_factory):
+    """Writes the placeholder textures and font TEST_CARD needs into ASSETS_DIR"""
+    import json
+    from synthetic_assets import generate_asset_pack
+
+    decks_dir = tmp_path_factory.mktemp("decks")
+    with open(decks_dir / "neutral.json", "w") as file:
+        json.dump([TEST_CARD], file)
+    generate_asset_pack(ASSETS_DIR, str(decks_dir))
+    return ASSETS_DIR
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(ASSETS_DIR, ignore_errors=True)
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+from PIL import Image
+
+import asset_store
+from asset_store import AssetStore, compile_asset_store
+
+
+def write_dds(path, colour):
+    Image.new("RGBA", (4, 4), colour).save(path, format="DDS")
+
+
+@pytest.fixture
+def assets(tmp_path):
+    assets_dir = tmp_path / "assets"
+    (tmp_path / "decks").mkdir()
+    assets_dir.mkdir()
+    write_dds(assets_dir / "layer.dds", (255, 0, 0, 255))
+    return assets_dir
+
+
+def compile_store(assets):
+    return compile_asset_store(str(assets), str(assets / ".store"), str(assets.parent / "decks"))
+
+
+def test_store_is_one_file(assets):
+    assert compile_store(assets) == 1
+    assert os.listdir(assets / ".store") == ["store.bin"]
+    assert compile_store(assets) == 0
+
+
+def test_open_store_keeps_reading_its_own_version_after_recompile(assets):
+    compile_store(assets)
+    old = AssetStore(str(assets / ".store"), str(assets))
+
+    write_dds(assets / "layer.dds", (0, 0, 255, 255))
+    os.utime(assets / "layer.dds", ns=(1, 1))
+    compile_store(assets)
+    new = AssetStore(str(assets / ".store"), str(assets))
+
+    assert new.get(str(assets / "layer.dds")).getpixel((0, 0)) == (0, 0, 255, 255)
+    assert old.entries != new.entries
+    assert bytes(old._view[:4]) == bytes((255, 0, 0, 255))
+
+
+def test_truncated_store_is_rejected(assets):
+    compile_store(assets)
+    store_path = assets / ".store" / "store.bin"
+    store_path.write_bytes(store_path.read_bytes()[:-4])
+    with pytest.raises(ValueError):
+        AssetStore(str(assets / ".store"), str(assets))
+    assert compile_store(assets) == 1
+
+
+def test_missing_store_is_not_up_to_date(tmp_path):
+    assert not asset_store._is_up_to_date(str(tmp_path / "store.bin"), str(tmp_path), {})
+
+
+def test_unmapped_store_returns_private_copies(assets):
+    compile_store(assets)
+    mapped = AssetStore(str(assets / ".store"), str(assets))
+    unmapped = AssetStore(str(assets / ".store"), str(assets), mapped=False)
+
+    image = unmapped.get(str(assets / "layer.dds"))
+    assert image.tobytes() == mapped.get(str(assets / "layer.dds")).tobytes()
+    image.putpixel((0, 0), (0, 0, 0, 0))     # Writable, unlike the mmap-backed images
+    assert unmapped.get(str(assets / "layer.dds")).getpixel((0, 0)) == (255, 0, 0, 255)
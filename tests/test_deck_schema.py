@@ -0,0 +1,95 @@
+import io
+import json
+
+import pytest
+
+import deck_schema
+from deck_schema import ArtIndex, DeckValidationError, iter_json_array, iter_records
+from load_deck import load_deck
+from tests.conftest import TEST_CARD
+
+CHUNK_SIZES = [1, 2, 3, 5, 7, 64 * 1024]
+
+DOCUMENTS = [
+    "[]",
+    " [ ] \n",
+    "[1.5, 2e10, -0.25, 12345]",
+    '[true, false, null, "a,]b"]',
+    '[{"name": "A", "cost": 10}, {"name": "B\\"]", "effects": {"play": []}}]\n',
+    '[\n  {"n": 1},\n\n  [1, [2, 3]],\n  "\\u00e9"\n]',
+]
+
+
+def records(text, chunk_size, monkeypatch):
+    monkeypatch.setattr(deck_schema, "READ_CHUNK_SIZE", chunk_size)
+    return list(iter_json_array(io.StringIO(text)))
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_matches_json_loads_at_every_chunk_size(text, chunk_size, monkeypatch):
+    assert [record for _, record in records(text, chunk_size, monkeypatch)] == json.loads(text)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_numbers_split_across_chunks(chunk_size, monkeypatch):
+    # Every split point of "1.5", "1e5" and "-12" lands on a chunk boundary at some chunk size
+    text = "[1.5,1e5,-12,0.125]"
+    assert [record for _, record in records(text, chunk_size, monkeypatch)] == [1.5, 1e5, -12, 0.125]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_line_numbers(chunk_size, monkeypatch):
+    text = '[\n{"a": 1},\n\n{"b":\n 2},\n{"c": 3}]'
+    assert [line for line, _ in records(text, chunk_size, monkeypatch)] == [2, 4, 6]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", ['[1, 2] garbage', '[] x', '[{"a": 1}]]', '[1]\n,'])
+def test_rejects_data_after_the_array(text, chunk_size, monkeypatch):
+    with pytest.raises(DeckValidationError, match="after the closing"):
+        records(text, chunk_size, monkeypatch)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", ['', '{"a": 1}', '[1, 2', '[1 2]', '[{"a": }]', '[1,]', '[1.]'])
+def test_rejects_malformed_json(text, chunk_size, monkeypatch):
+    with pytest.raises(DeckValidationError):
+        records(text, chunk_size, monkeypatch)
+
+
+def test_error_reports_line(monkeypatch):
+    with pytest.raises(DeckValidationError) as e:
+        records('[\n{"a": 1},\n{"b": oops}\n]', 4, monkeypatch)
+    assert e.value.line == 3
+
+
+def test_records_before_an_error_are_yielded(monkeypatch):
+    monkeypatch.setattr(deck_schema, "READ_CHUNK_SIZE", 3)
+    iterator = iter_json_array(io.StringIO('[{"a": 1}, {"b": 2}, oops]'))
+    assert next(iterator)[1] == {"a": 1}
+    assert next(iterator)[1] == {"b": 2}
+    with pytest.raises(DeckValidationError):
+        next(iterator)
+
+
+def test_iter_records_collects_schema_and_trailing_errors(tmp_path):
+    deck_path = tmp_path / "deck.json"
+    valid = {"name": "A", "art": "a.dds", "type": "Action", "effects": {}}
+    deck_path.write_text(json.dumps([valid, {"name": "B"}]) + " trailing")
+
+    errors = []
+    assert [record for _, record in iter_records(str(deck_path), errors)] == [valid]
+    assert any("Missing required field 'art'" in str(error) for error in errors)
+    assert any("after the closing" in str(error) for error in errors)
+
+
+def test_load_deck_skips_cards_with_missing_art(asset_pack, tmp_path):
+    deck_path = tmp_path / "neutral.json"
+    deck_path.write_text(json.dumps([TEST_CARD, dict(TEST_CARD, name="Lost Song", art="lost_song.dds")]))
+
+    errors = []
+    cards = load_deck(str(deck_path), "neutral", errors, art_index=ArtIndex(asset_pack))
+    assert [card.name for card in cards] == ["War Song"]
+    assert [str(error) for error in errors] == [f"{deck_path}:1: 'Lost Song': Art file not found: "
+                                                f"{asset_pack}/cards/lost_song.dds"]
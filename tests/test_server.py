@@ -0,0 +1,172 @@
+import http.client
+import json
+import threading
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from deck_schema import ArtIndex
+from server import RenderCache, RenderError, RenderService, make_server
+from tests.conftest import TEST_CARD as CARD
+
+
+@pytest.fixture
+def service(tmp_path):
+    (tmp_path / "cards").mkdir()
+    (tmp_path / "cards" / "war_song.dds").write_bytes(b"")
+    (tmp_path / "outside.dds").write_bytes(b"")
+    service = RenderService(jobs=1)
+    service.art_index = ArtIndex(str(tmp_path))
+    yield service
+    service.close()
+
+
+def serve(service):
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def server(service):
+    server = serve(service)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def render_server(asset_pack):
+    service = RenderService(jobs=2)
+    server = serve(service)
+    yield server, service
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def post(server, body, headers=None, query="deck=druid"):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    connection.request("POST", f"/render?{query}", body=body, headers=headers or {})
+    response = connection.getresponse()
+    payload = response.read()
+    connection.close()
+    return response.status, payload
+
+
+@pytest.mark.parametrize("art", ["/etc/passwd", "../outside.dds", "cards/../../outside.dds", "sub/war_song.dds", ".."])
+def test_render_rejects_art_paths(service, art):
+    with pytest.raises(RenderError) as e:
+        service.render(dict(CARD, art=art), "druid")
+    assert e.value.status == 400
+
+
+def test_art_index_only_lists_files_in_cards_dir(service):
+    assert "war_song.dds" in service.art_index
+    assert "../outside.dds" not in service.art_index
+    assert "missing.dds" not in service.art_index
+
+
+@pytest.mark.parametrize("art", ["/etc/passwd", "../outside.dds"])
+def test_post_rejects_art_paths(server, art):
+    status, payload = post(server, json.dumps(dict(CARD, art=art)))
+    assert status == 400
+    assert "art" in json.loads(payload)["error"]
+
+
+def test_post_rejects_negative_content_length(server):
+    status, _ = post(server, "{}", headers={"Content-Length": "-1"})
+    assert status == 400
+
+
+def test_post_rejects_oversized_body(server):
+    status, _ = post(server, "{}", headers={"Content-Length": str(10 * 1024 * 1024)})
+    assert status == 413
+
+
+@pytest.mark.parametrize("query", ["deck=druid&format=gif", "deck=druid&scale=0", "deck=druid&scale=5", "deck=druid&scale=big"])
+def test_post_rejects_bad_query(server, query):
+    status, _ = post(server, json.dumps(CARD), query=query)
+    assert status == 400
+
+
+def test_post_rejects_invalid_card(server):
+    status, payload = post(server, json.dumps({"name": "No art"}))
+    assert status == 400
+    assert "Missing required field 'art'" in json.loads(payload)["error"]
+
+
+def test_too_many_pending_renders(service):
+    service._max_pending = 0
+    with pytest.raises(RenderError) as e:
+        service.render(CARD, "druid")
+    assert e.value.status == 503
+
+
+def test_cache_key_ignores_deck_case(service):
+    service._max_pending = 0
+    service.cache.put(RenderService.cache_key(CARD, "hlaalu", 1, "png"), b"png")
+    assert service.render(CARD, "Hlaalu") == b"png"
+    assert service.render(CARD, "hlaalu") == b"png"
+
+
+def test_render_cache_evicts_least_recently_used():
+    cache = RenderCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"     # b is now the oldest
+    cache.put("c", b"cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa" and cache.get("c") == b"cccc"
+    assert cache.current_bytes == 8
+
+
+def test_render_cache_skips_entries_larger_than_the_cache():
+    cache = RenderCache(max_bytes=4)
+    cache.put("big", b"12345")
+    assert cache.get("big") is None
+    assert cache.current_bytes == 0
+
+
+def test_unavailable_format_is_a_bad_request(service, monkeypatch):
+    def unavailable(options):
+        raise RuntimeError("AVIF output needs Pillow >= 11.2 or the pillow-avif-plugin package")
+    monkeypatch.setattr("encoding.EncoderOptions.check_available", unavailable)
+    with pytest.raises(RenderError) as e:
+        service.render(CARD, "druid", format="avif")
+    assert e.value.status == 400
+
+
+def test_concurrent_identical_requests_render_once(render_server):
+    server, service = render_server
+    requests = 6
+    barrier = threading.Barrier(requests)
+    responses = [None] * requests
+
+    def send(i):
+        barrier.wait()
+        responses[i] = post(server, json.dumps(CARD), query="deck=Hlaalu")
+
+    threads = [threading.Thread(target=send, args=(i,)) for i in range(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(status == 200 for status, _ in responses)
+    bodies = {body for _, body in responses}
+    assert len(bodies) == 1
+    image = Image.open(BytesIO(bodies.pop()))
+    assert (image.format, image.size) == ("PNG", (284, 493))
+
+    # One render; the requests that arrived while it ran waited for it, any later one hit the cache
+    stats = service.stats()
+    assert stats["coalesced"] >= 1
+    assert stats["coalesced"] + stats["cache_hits"] == requests - 1
+    assert stats["cache_bytes"] == len(responses[0][1]) and stats["in_flight"] == 0
+
+    # Same card, deck spelled differently: served from the cache
+    status, body = post(server, json.dumps(CARD), query="deck=hlaalu")
+    assert (status, body) == (200, responses[0][1])
+    assert service.stats()["cache_hits"] == stats["cache_hits"] + 1
@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from shard_queue import QUEUE_VERSION, ShardQueue
+
+JOBS = [("decks/a.json", index) for index in range(5)] + [("decks/b.json", index) for index in range(3)]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ShardQueue(str(tmp_path / "queue"))
+    queue.create(JOBS, {"render": "png"}, shard_size=3)
+    return queue
+
+
+def test_create_splits_jobs_into_shards(queue):
+    assert [len(shard["jobs"]) for shard in queue.shards] == [3, 3, 2]
+    assert [tuple(job) for shard in queue.shards for job in shard["jobs"]] == JOBS
+    assert queue.status() == (0, 0, 3)
+
+    # Another process sees the same queue
+    reopened = ShardQueue(queue.queue_dir)
+    assert reopened.shards == queue.shards and reopened.settings == {"render": "png"}
+
+
+def test_rejects_other_queue_versions(queue):
+    with open(queue.manifest_path, "w") as file:
+        file.write(f'{{"version": {QUEUE_VERSION + 1}, "settings": {{}}, "shards": []}}')
+    with pytest.raises(ValueError):
+        ShardQueue(queue.queue_dir).shards
+
+
+def test_claims_each_shard_once(queue):
+    claimed = [queue.claim("w1")["id"], queue.claim("w2")["id"], queue.claim("w1")["id"]]
+    assert claimed == ["00000", "00001", "00002"]
+    assert queue.claim("w3") is None
+    assert queue.status() == (0, 3, 0)
+
+
+def test_concurrent_workers_never_share_a_shard(queue):
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(name):
+        # Separate instances, as separate processes or hosts would have
+        worker_queue = ShardQueue(queue.queue_dir)
+        while (shard := worker_queue.claim(name)) is not None:
+            with lock:
+                claimed.append(shard["id"])
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == ["00000", "00001", "00002"]
+
+
+def _claim_all(queue_dir, name):
+    worker_queue = ShardQueue(queue_dir)
+    claimed = []
+    while (shard := worker_queue.claim(name)) is not None:
+        claimed.append(shard["id"])
+        time.sleep(0.01)   # Hold the shard a moment so the other processes race for the rest
+    return claimed
+
+
+def test_concurrent_processes_never_share_a_shard(tmp_path):
+    queue = ShardQueue(str(tmp_path / "queue"))
+    queue.create(JOBS * 4, {}, shard_size=1)
+
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        results = pool.starmap(_claim_all, [(queue.queue_dir, f"w{i}") for i in range(4)])
+    claimed = [shard_id for result in results for shard_id in result]
+    assert sorted(claimed) == [shard["id"] for shard in queue.shards]
+    assert queue.status() == (0, len(queue.shards), 0)
+
+
+def test_complete_releases_the_lease_and_records_the_result(queue):
+    shard = queue.claim("w1")
+    queue.complete(shard["id"], {"shard": shard["id"], "cards": []})
+    assert not os.path.exists(queue._lease_path(shard["id"]))
+    assert list(queue.completed()) == [{"shard": shard["id"], "cards": []}]
+    assert queue.status() == (1, 0, 2)
+
+    # Done shards are never claimed again
+    assert [queue.claim("w1")["id"], queue.claim("w1")["id"], queue.claim("w1")] == ["00001", "00002", None]
+
+
+def test_expired_lease_is_requeued(queue):
+    stale = queue.claim("crashed")
+    live = queue.claim("alive")
+    past = time.time() - 120
+    os.utime(queue._lease_path(stale["id"]), (past, past))
+
+    assert queue.requeue_expired(lease_seconds=60) == [stale["id"]]
+    assert queue.status() == (0, 1, 2)
+    assert queue.claim("w2")["id"] == stale["id"]
+    assert queue.requeue_expired(lease_seconds=60) == []
+    assert live["id"] != stale["id"]
+
+
+def test_renewed_lease_is_kept(queue):
+    shard = queue.claim("w1")
+    past = time.time() - 120
+    os.utime(queue._lease_path(shard["id"]), (past, past))
+    queue.renew(shard["id"])
+    assert queue.requeue_expired(lease_seconds=60) == []
+
+
+def test_keep_alive_renews_until_stopped(queue):
+    shard = queue.claim("w1")
+    past = time.time() - 120
+    os.utime(queue._lease_path(shard["id"]), (past, past))
+
+    stop = queue.keep_alive(shard["id"], interval=0.01)
+    time.sleep(0.1)
+    stop.set()
+    assert queue.requeue_expired(lease_seconds=60) == []
+
+
+def test_finished_shard_is_not_requeued(queue):
+    shard = queue.claim("w1")
+    queue.complete(shard["id"], {"shard": shard["id"]})
+    # A stray lease left next to a done record (e.g. a re-queued worker finishing late)
+    open(queue._lease_path(shard["id"]), "w").close()
+    assert queue.requeue_expired(lease_seconds=0, now=time.time() + 10) == []
+
+
+def test_renew_after_requeue_is_harmless(queue):
+    shard = queue.claim("w1")
+    queue.requeue_expired(lease_seconds=0, now=time.time() + 10)
+    queue.renew(shard["id"])
+    assert not os.path.exists(queue._lease_path(shard["id"]))
+
+
+def test_create_drops_the_previous_queue(queue):
+    shard = queue.claim("w1")
+    queue.complete(shard["id"], {})
+    queue.claim("w1")
+    queue.create(JOBS[:2], {}, shard_size=3)
+    assert queue.status() == (0, 0, 1)